@@ -5,12 +5,13 @@ from ..models.schemas import (
     APIConfig,
     APIConfigResponse
 )
-from ..services.config_service import ConfigService
+from ..services.service_registry import service_registry
 
 
 router = APIRouter()
 
-config_service = ConfigService()
+# 与字幕服务共用同一个配置服务，保存配置后服务注册表会切换到新实例
+config_service = service_registry.config_service
 
 
 @router.get("/config", response_model=APIConfigResponse)
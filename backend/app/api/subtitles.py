@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from typing import Optional
-import os
-import tempfile
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional, TypeVar
+import asyncio
+import json
 from pydantic import BaseModel
 
 from ..models.schemas import (
@@ -9,11 +10,36 @@ from ..models.schemas import (
     SubtitleResponse,
     SubtitleEditRequest,
     SubtitleEditResponse,
-    FileUploadResponse
+    FileUploadResponse,
+    JobSubmitResponse,
+    JobStatusResponse,
+    JobProgressEvent,
+    JobStatus,
+    UploadSessionRequest,
+    UploadSessionResponse
 )
 from ..services.subtitle_service import AudioSubtitleService
-from ..services.config_service import ConfigService
 from ..services.file_service import FileService
+from ..services.service_registry import service_registry
+from ..services.job_service import FINISHED_STATUSES, Job, JobService, JobQueueFullError
+from ..services.storage_reaper import StorageReaper
+from ..services.resumable_upload import (
+    ResumableUploadService,
+    UploadOffsetMismatch,
+    UploadSessionNotFound,
+    UploadTooLarge
+)
+from ..services.translation_memory import TranslationMemoryStats
+from ..models.segment_store import SegmentStore
+from ..utils.srt import (
+    SRTParseError,
+    format_timestamp,
+    iter_srt_chunks,
+    parse_srt,
+    render_srt,
+    segment_entries,
+    validate_srt
+)
 
 
 class URLRequest(BaseModel):
@@ -31,24 +57,40 @@ class TranslationRequest(BaseModel):
 router = APIRouter()
 
 # 初始化服务
-config_service = ConfigService()
 file_service = FileService()
-subtitle_service: Optional[AudioSubtitleService] = None
+job_service = JobService()
+resumable_uploads = ResumableUploadService(file_service)
+storage_reaper = StorageReaper(file_service, resumable_uploads=resumable_uploads)
+
+# SSE和NDJSON流空闲时发送心跳的间隔（秒）
+SSE_KEEPALIVE_SECONDS = 15
+
+T = TypeVar("T")
 
 
 def get_subtitle_service() -> AudioSubtitleService:
-    """获取字幕服务实例"""
-    global subtitle_service
+    """获取与当前配置对应的字幕服务实例"""
+    service = service_registry.get_service()
+    if service is None:
+        raise HTTPException(status_code=400, detail="API configuration not found")
     
-    if subtitle_service is None:
-        config = config_service.get_config()
-        if not config:
-            raise HTTPException(status_code=400, detail="API configuration not found")
-        
-        subtitle_service = AudioSubtitleService(config)
-        print(f"Created new subtitle service, translation_client: {subtitle_service.translation_client is not None}")
+    return service
+
+
+def acquire_subtitle_service() -> AudioSubtitleService:
+    """获取字幕服务实例并登记为使用中，配置变更时旧实例会等到释放后才关闭"""
+    service = service_registry.acquire()
+    if service is None:
+        raise HTTPException(status_code=400, detail="API configuration not found")
     
-    return subtitle_service
+    return service
+
+
+async def shutdown_services():
+    """关闭后台任务和网络连接"""
+    await storage_reaper.stop()
+    await job_service.shutdown()
+    await service_registry.aclose()
 
 
 @router.post("/upload", response_model=FileUploadResponse)
@@ -62,54 +104,209 @@ async def upload_file(file: UploadFile = File(...)):
     return result
 
 
+@router.post("/uploads", response_model=UploadSessionResponse, status_code=201)
+async def create_upload_session(request: UploadSessionRequest):
+    """创建分块上传会话（用于大文件，支持断点续传）"""
+    try:
+        session = resumable_uploads.create(request.filename, request.file_size, request.content_type)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return resumable_uploads.to_response(session)
+
+
+@router.get("/uploads/{session_id}", response_model=UploadSessionResponse)
+async def get_upload_session(session_id: str):
+    """查询已接收的字节数，断线重连后从该偏移继续上传"""
+    try:
+        return resumable_uploads.to_response(resumable_uploads.get(session_id))
+    except UploadSessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.put("/uploads/{session_id}", response_model=UploadSessionResponse)
+async def upload_chunk(session_id: str, offset: int, request: Request):
+    """上传一个分块，请求体为原始字节，offset必须等于服务端已接收的字节数"""
+    content_length = request.headers.get("content-length")
+    if content_length is not None:
+        try:
+            content_length = int(content_length)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+        if content_length > resumable_uploads.max_chunk_size:
+            raise HTTPException(status_code=413, detail="Chunk exceeds maximum size")
+    
+    try:
+        session = await resumable_uploads.write_chunk(session_id, offset, request.stream())
+    except UploadSessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UploadOffsetMismatch as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "offset": e.offset})
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    return resumable_uploads.to_response(session)
+
+
+@router.post("/uploads/{session_id}/complete", response_model=FileUploadResponse)
+async def complete_upload(session_id: str):
+    """完成分块上传，返回与 /upload 相同的文件信息"""
+    try:
+        return await resumable_uploads.complete(session_id)
+    except UploadSessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UploadOffsetMismatch as e:
+        raise HTTPException(status_code=409, detail={"message": "Upload is incomplete", "offset": e.offset})
+
+
+@router.delete("/uploads/{session_id}")
+async def abort_upload(session_id: str):
+    """取消分块上传"""
+    try:
+        resumable_uploads.abort(session_id)
+    except UploadSessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return {"message": "Upload session deleted"}
+
+
+def submit_file_job(file_id: str, request: SubtitleRequest) -> Job:
+    """提交文件字幕生成任务"""
+    # 检查配置，任务开始执行时才获取字幕服务
+    get_subtitle_service()
+    
+    # 从上传索引获取文件路径和内容哈希，并在任务结束前阻止回收该文件
+    record = file_service.acquire_file(file_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    async def run(job: Job) -> SubtitleResponse:
+        service = acquire_subtitle_service()
+        try:
+            # 处理音频文件
+            return await service.process_audio_file(
+                record.path, request, content_hash=record.file_hash, progress=job.set_stage
+            )
+        finally:
+            await service_registry.release(service)
+    
+    def cleanup(job: Job):
+        # 任务结束（包括排队时被取消）后解除占用；只在成功后删除上传的文件，
+        # 失败或取消时保留以便使用同一file_id重试，由回收任务按TTL清理
+        file_service.release_file(file_id)
+        if job.status == JobStatus.COMPLETED:
+            file_service.delete_file(file_id)
+    
+    try:
+        job = job_service.submit("generate-subtitles", run)
+    except JobQueueFullError as e:
+        file_service.release_file(file_id)
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    job.add_done_callback(cleanup)
+    return job
+
+
+def submit_url_job(request: URLRequest) -> Job:
+    """提交URL字幕生成任务"""
+    # 检查配置，任务开始执行时才获取字幕服务
+    get_subtitle_service()
+    
+    # 转换为SubtitleRequest
+    subtitle_request = SubtitleRequest(
+        source_language=request.source_language,
+        translate=request.translate,
+        target_language=request.target_language
+    )
+    
+    async def run(job: Job) -> SubtitleResponse:
+        service = acquire_subtitle_service()
+        try:
+            # 处理URL
+            return await service.process_url(request.url, subtitle_request, progress=job.set_stage)
+        finally:
+            await service_registry.release(service)
+    
+    try:
+        return job_service.submit("process-url", run)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+async def wait_for_job(job: Job, http_request: Request, check_interval: float = 1.0):
+    """等待任务结束，客户端断开连接时取消任务"""
+    try:
+        while not job.is_finished:
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=check_interval)
+            except asyncio.TimeoutError:
+                if await http_request.is_disconnected():
+                    print(f"Client disconnected, cancelling job {job.job_id}")
+                    job_service.cancel(job.job_id)
+                    await job.done.wait()
+    except asyncio.CancelledError:
+        job_service.cancel(job.job_id)
+        raise
+
+
 @router.post("/generate-subtitles", response_model=SubtitleResponse)
 async def generate_subtitles(
     request: SubtitleRequest,
-    file_id: str
+    file_id: str,
+    http_request: Request
 ):
-    """生成字幕"""
-    # 获取文件路径
-    file_path = file_service.get_file_path(file_id)
-    if not file_path:
-        raise HTTPException(status_code=404, detail="File not found")
-    
-    # 获取字幕服务
-    service = get_subtitle_service()
-    
-    # 处理音频文件
-    result = service.process_audio_file(str(file_path), request)
+    """生成字幕（等待任务完成）"""
+    job = submit_file_job(file_id, request)
+    await wait_for_job(job, http_request)
     
-    if not result.success:
-        raise HTTPException(status_code=500, detail=result.message)
+    if not job.result or not job.result.success:
+        raise HTTPException(status_code=500, detail=job.message)
     
-    # 清理上传的文件
-    file_service.delete_file(file_id)
+    return job.result
+
+
+@router.post("/jobs/generate-subtitles", response_model=JobSubmitResponse, status_code=202)
+async def submit_generate_subtitles(
+    request: SubtitleRequest,
+    file_id: str
+):
+    """提交字幕生成任务，立即返回任务ID"""
+    job = submit_file_job(file_id, request)
     
-    return result
+    return JobSubmitResponse(
+        success=True,
+        message="Job submitted successfully",
+        job_id=job.job_id,
+        status=job.status
+    )
 
 
 @router.post("/edit-subtitles", response_model=SubtitleEditResponse)
 async def edit_subtitles(request: SubtitleEditRequest):
     """编辑字幕"""
     try:
-        service = get_subtitle_service()
-        
         # 验证SRT格式
-        if request.original_srt and not service.validate_srt_format(request.original_srt):
-            return SubtitleEditResponse(
-                success=False,
-                message="Invalid SRT format for original subtitles",
-                original_srt=None,
-                translated_srt=None
-            )
+        if request.original_srt:
+            error = validate_srt(request.original_srt)
+            if error:
+                return SubtitleEditResponse(
+                    success=False,
+                    message=f"Invalid SRT format for original subtitles ({error})",
+                    original_srt=None,
+                    translated_srt=None
+                )
         
-        if request.translated_srt and not service.validate_srt_format(request.translated_srt):
-            return SubtitleEditResponse(
-                success=False,
-                message="Invalid SRT format for translated subtitles",
-                original_srt=None,
-                translated_srt=None
-            )
+        if request.translated_srt:
+            error = validate_srt(request.translated_srt)
+            if error:
+                return SubtitleEditResponse(
+                    success=False,
+                    message=f"Invalid SRT format for translated subtitles ({error})",
+                    original_srt=None,
+                    translated_srt=None
+                )
         
         return SubtitleEditResponse(
             success=True,
@@ -127,6 +324,29 @@ async def edit_subtitles(request: SubtitleEditRequest):
         )
 
 
+@router.get("/translation/probe")
+async def probe_translation(refresh: bool = False):
+    """检测翻译服务连通性（结果缓存）"""
+    service = get_subtitle_service()
+    return await service.probe_translation_client(force=refresh)
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """获取缓存命中统计"""
+    service = get_subtitle_service()
+    return {
+        "transcription": service.transcription_cache.stats(),
+        "translation_memory": service.translation_memory.stats()
+    }
+
+
+@router.get("/storage/stats")
+async def get_storage_stats():
+    """获取上传目录占用和回收统计"""
+    return {**storage_reaper.metrics(), "resumable": resumable_uploads.metrics()}
+
+
 @router.get("/file/{file_id}")
 async def get_file_info(file_id: str):
     """获取文件信息"""
@@ -148,26 +368,114 @@ async def delete_file(file_id: str):
 
 
 @router.post("/process-url", response_model=SubtitleResponse)
-async def process_video_url(request: URLRequest):
-    """处理在线视频URL"""
+async def process_video_url(request: URLRequest, http_request: Request):
+    """处理在线视频URL（等待任务完成）"""
+    job = submit_url_job(request)
+    await wait_for_job(job, http_request)
+    
+    if job.result:
+        return job.result
+    
+    raise HTTPException(status_code=500, detail=f"Error processing URL: {job.message}")
+
+
+@router.post("/jobs/process-url", response_model=JobSubmitResponse, status_code=202)
+async def submit_process_url(request: URLRequest):
+    """提交URL处理任务，立即返回任务ID"""
+    job = submit_url_job(request)
+    
+    return JobSubmitResponse(
+        success=True,
+        message="Job submitted successfully",
+        job_id=job.job_id,
+        status=job.status
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(job_id: str):
+    """查询任务状态和结果"""
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return job.to_response()
+
+
+def format_sse(event: JobProgressEvent) -> str:
+    """格式化为SSE消息"""
+    return f"id: {event.seq}\ndata: {event.json()}\n\n"
+
+
+async def iter_job_events(job: Job, request: Request) -> AsyncIterator[str]:
+    """推送任务进度直到任务结束或客户端断开"""
+    queue = job.subscribe()
     try:
-        # 获取字幕服务
-        service = get_subtitle_service()
-        
-        # 转换为SubtitleRequest
-        subtitle_request = SubtitleRequest(
-            source_language=request.source_language,
-            translate=request.translate,
-            target_language=request.target_language
-        )
+        # 先发送当前状态，之后只推送变化
+        event = job.to_event()
+        yield f"retry: 3000\n{format_sse(event)}"
         
-        # 处理URL
-        result = service.process_url(request.url, subtitle_request)
-        
-        return result
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error processing URL: {str(e)}")
+        while event.status not in FINISHED_STATUSES:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            
+            yield format_sse(event)
+    finally:
+        job.unsubscribe(queue)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """以Server-Sent Events推送任务阶段和进度"""
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    return StreamingResponse(
+        iter_job_events(job, request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/jobs/{job_id}/srt")
+async def download_job_srt(job_id: str, translated: bool = False):
+    """流式下载任务生成的SRT字幕"""
+    job = job_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if not job.result or not job.result.success or not job.result.segments:
+        raise HTTPException(status_code=409, detail="Job has no subtitles")
+    
+    if translated and not job.result.translated_srt:
+        raise HTTPException(status_code=404, detail="Job has no translated subtitles")
+    
+    entries = segment_entries(job.result.segments, is_translation=translated)
+    filename = f"{job_id}.{'translated' if translated else 'original'}.srt"
+    
+    return StreamingResponse(
+        iter_srt_chunks(entries),
+        media_type="application/x-subrip; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """取消任务"""
+    if not job_service.get_job(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if not job_service.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job already finished")
+    
+    return {"message": "Job cancelled successfully"}
 
 
 @router.post("/translate-subtitles", response_model=SubtitleEditResponse)
@@ -176,20 +484,35 @@ async def translate_subtitles(
 ):
     """翻译字幕"""
     try:
-        service = get_subtitle_service()
-        
-        # 验证SRT格式
-        if not service.validate_srt_format(request.original_srt):
+        service = acquire_subtitle_service()
+    except Exception as e:
+        return SubtitleEditResponse(
+            success=False,
+            message=f"Error translating subtitles: {str(e)}",
+            original_srt=None,
+            translated_srt=None
+        )
+    
+    try:
+        return await _translate_subtitles(service, request)
+    finally:
+        await service_registry.release(service)
+
+
+async def _translate_subtitles(service: AudioSubtitleService, request: TranslationRequest) -> SubtitleEditResponse:
+    """使用指定服务实例翻译字幕"""
+    try:
+        # 一次遍历完成SRT校验和解析
+        try:
+            segments = SegmentStore.from_cues(parse_srt(request.original_srt))
+        except SRTParseError as e:
             return SubtitleEditResponse(
                 success=False,
-                message="Invalid SRT format",
+                message=f"Invalid SRT format ({e})",
                 original_srt=None,
                 translated_srt=None
             )
         
-        # 解析SRT文件
-        segments = service.parse_srt(request.original_srt)
-        
         # 检查翻译服务是否可用
         if not service.translation_client:
             return SubtitleEditResponse(
@@ -200,42 +523,27 @@ async def translate_subtitles(
             )
         
         # 使用批量翻译提高效率
-        translated_segments = []
-        failed_segments = []
+        translation_stats = TranslationMemoryStats()
         
         try:
-            # 批量翻译
-            texts = [segment['text'] for segment in segments]
-            translated_texts = service.translate_text_batch(texts, request.target_language)
-            
-            # 将翻译结果分配给对应的片段
-            for i, (segment, translated_text) in enumerate(zip(segments, translated_texts)):
-                translated_segments.append({
-                    **segment,
-                    'translated_text': translated_text
-                })
-                
+            # 批量翻译（缺失的编号已在批次内重新请求）
+            translated_texts = await asyncio.to_thread(
+                service.translate_text_batch,
+                segments.texts(),
+                request.target_language,
+                translation_stats,
+                service.translation_concurrency
+            )
         except Exception as e:
-            print(f"Batch translation failed, falling back to individual translation: {e}")
-            # 如果批量翻译失败，回退到单个翻译
-            for i, segment in enumerate(segments):
-                try:
-                    translated_text = service.translate_text(segment['text'], request.target_language)
-                    translated_segments.append({
-                        **segment,
-                        'translated_text': translated_text
-                    })
-                except Exception as e:
-                    print(f"Failed to translate segment {i+1}: {e}")
-                    failed_segments.append(i+1)
-                    # 如果翻译失败，使用原文
-                    translated_segments.append({
-                        **segment,
-                        'translated_text': f"[Translation failed] {segment['text']}"
-                    })
+            # 批量翻译重试后仍失败时不再逐条调用LLM，所有片段保留原文
+            print(f"Batch translation failed: {e}")
+            translated_texts = [None] * len(segments)
+        
+        failed_segments = [i + 1 for i, text in enumerate(translated_texts) if text is None]
         
-        # 生成翻译后的SRT
-        translated_srt = service.generate_srt_from_segments(translated_segments)
+        # 将翻译结果写入译文列并生成翻译后的SRT
+        segments.set_translations(translated_texts)
+        translated_srt = render_srt(segments.entries(is_translation=True))
         
         # 如果有失败的片段，在消息中说明
         success_message = "Subtitles translated successfully"
@@ -246,7 +554,9 @@ async def translate_subtitles(
             success=True,
             message=success_message,
             original_srt=request.original_srt,
-            translated_srt=translated_srt
+            translated_srt=translated_srt,
+            translation_memory_hits=translation_stats.hits,
+            translation_memory_misses=translation_stats.misses
         )
         
     except Exception as e:
@@ -255,4 +565,129 @@ async def translate_subtitles(
             message=f"Error translating subtitles: {str(e)}",
             original_srt=None,
             translated_srt=None
-        )
\ No newline at end of file
+        )
+
+
+def format_ndjson(data: dict) -> str:
+    """格式化为一行NDJSON"""
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+
+@router.post("/translate-subtitles/stream")
+async def translate_subtitles_stream(request: TranslationRequest):
+    """流式翻译字幕：每个批次完成后立即以NDJSON逐条返回译文"""
+    try:
+        segments = SegmentStore.from_cues(parse_srt(request.original_srt))
+    except SRTParseError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid SRT format ({e})")
+    
+    if not get_subtitle_service().translation_client:
+        raise HTTPException(
+            status_code=400,
+            detail="Translation service not configured. Please set up your translation API keys in the configuration."
+        )
+    
+    # 服务实例在响应体开始迭代时才登记使用，客户端提前断开时不会遗留占用
+    return StreamingResponse(
+        iter_translation_events(segments, request.target_language),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def with_keepalive(items: AsyncIterator[T], interval: float) -> AsyncIterator[Optional[T]]:
+    """迭代异步序列，超过interval秒没有新元素时产出None，供调用方发送心跳"""
+    iterator = items.__aiter__()
+    pending: Optional[asyncio.Future] = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            
+            done, _ = await asyncio.wait({pending}, timeout=interval)
+            if not done:
+                yield None
+                continue
+            
+            finished, pending = pending, None
+            try:
+                yield finished.result()
+            except StopAsyncIteration:
+                return
+    finally:
+        # 提前结束时先取消正在等待的元素，再关闭底层生成器
+        if pending is not None:
+            pending.cancel()
+            await asyncio.gather(pending, return_exceptions=True)
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
+
+
+async def iter_translation_events(segments: SegmentStore, target_language: str) -> AsyncIterator[str]:
+    """按批次完成顺序产出译文片段，最后产出完整的翻译SRT；批次进行中定期发送空行作为心跳"""
+    service = service_registry.acquire()
+    if service is None:
+        yield format_ndjson({"type": "error", "success": False, "message": "API configuration not found"})
+        return
+    
+    translation_stats = TranslationMemoryStats()
+    translated_texts = [None] * len(segments)
+    
+    try:
+        yield format_ndjson({"type": "start", "segment_count": len(segments)})
+        
+        batches = with_keepalive(
+            service.iter_translated_batches(segments.texts(), target_language, translation_stats),
+            SSE_KEEPALIVE_SECONDS
+        )
+        try:
+            async for batch in batches:
+                if batch is None:
+                    # NDJSON客户端忽略空行，用于避免代理在长批次期间超时断开
+                    yield "\n"
+                    continue
+                
+                start, translated = batch
+                lines = []
+                for i, translated_text in enumerate(translated, start):
+                    translated_texts[i] = translated_text
+                    lines.append(format_ndjson({
+                        "type": "segment",
+                        "index": i + 1,
+                        "start": segments.starts[i],
+                        "end": segments.ends[i],
+                        "start_time": format_timestamp(segments.starts[i]),
+                        "end_time": format_timestamp(segments.ends[i]),
+                        "text": segments.text(i),
+                        "translated_text": translated_text
+                    }))
+                # 同一批次的片段合并为一次写出
+                yield "".join(lines)
+        finally:
+            await batches.aclose()
+        
+        segments.set_translations(translated_texts)
+        failed_count = translated_texts.count(None)
+        
+        message = "Subtitles translated successfully"
+        if failed_count:
+            message += f" (Note: {failed_count} segments failed to translate and were left in original language)"
+        
+        yield format_ndjson({
+            "type": "done",
+            "success": True,
+            "message": message,
+            "translated_srt": render_srt(segments.entries(is_translation=True)),
+            "failed_count": failed_count,
+            "translation_memory_hits": translation_stats.hits,
+            "translation_memory_misses": translation_stats.misses
+        })
+        
+    except Exception as e:
+        yield format_ndjson({
+            "type": "error",
+            "success": False,
+            "message": f"Error translating subtitles: {str(e)}"
+        })
+    finally:
+        await service_registry.release(service)
@@ -11,7 +11,7 @@ load_dotenv()
 # 新版本的OpenAI库支持代理环境变量，不再需要移除
 # from .api import subtitles_router, config_router, health_router
 from .api import subtitles_router, config_router, health_router
-from .services.file_service import FileService
+from .api.subtitles import file_service, shutdown_services, storage_reaper
 
 
 @asynccontextmanager
@@ -20,14 +20,15 @@ async def lifespan(app: FastAPI):
     # 启动时执行
     print("Starting Audio Subtitle Translator API with LangChain...")
     
-    # 清理旧文件
-    file_service = FileService()
-    file_service.cleanup_temp_files()
+    # 重建上传索引，并启动定期回收旧文件
+    file_service.rebuild_index()
+    storage_reaper.start()
     
     yield
     
     # 关闭时执行
     print("Shutting down Audio Subtitle Translator API...")
+    await shutdown_services()
 
 
 # 创建FastAPI应用
@@ -78,6 +79,7 @@ async def api_info():
             "health": "/api/health",
             "config": "/api/config",
             "subtitles": "/api/generate-subtitles",
+            "jobs": "/api/jobs/{job_id}",
             "upload": "/api/upload"
         },
         "supported_formats": {
@@ -1,4 +1,5 @@
 from .schemas import *
+from .segment_store import SegmentStore
 
 
 __all__ = [
@@ -10,7 +11,14 @@ __all__ = [
     "APIConfig",
     "APIConfigResponse",
     "FileUploadResponse",
+    "UploadSessionRequest",
+    "UploadSessionResponse",
     "SubtitleEditRequest",
     "SubtitleEditResponse",
-    "HealthResponse"
+    "JobStatus",
+    "JobSubmitResponse",
+    "JobStatusResponse",
+    "JobProgressEvent",
+    "HealthResponse",
+    "SegmentStore"
 ]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 
@@ -59,6 +59,8 @@ class SubtitleResponse(BaseModel):
     translated_srt: Optional[str] = Field(None, description="翻译SRT内容")
     duration: Optional[float] = Field(None, description="音频时长")
     segment_count: Optional[int] = Field(None, description="字幕片段数量")
+    translation_memory_hits: Optional[int] = Field(None, description="翻译记忆命中数")
+    translation_memory_misses: Optional[int] = Field(None, description="翻译记忆未命中数")
 
 
 class APIConfig(BaseModel):
@@ -94,6 +96,26 @@ class FileUploadResponse(BaseModel):
     file_size: Optional[int] = Field(None, description="文件大小")
     file_type: Optional[str] = Field(None, description="文件类型")
     is_video: Optional[bool] = Field(None, description="是否为视频文件")
+    file_hash: Optional[str] = Field(None, description="文件内容SHA-256")
+    deduplicated: bool = Field(False, description="内容与已上传的文件相同，共享同一存储文件")
+
+
+class UploadSessionRequest(BaseModel):
+    """创建分块上传会话请求"""
+    filename: str = Field(..., description="原始文件名")
+    file_size: int = Field(..., gt=0, description="文件总大小（字节）")
+    content_type: Optional[str] = Field(None, description="文件类型")
+
+
+class UploadSessionResponse(BaseModel):
+    """分块上传会话状态"""
+    session_id: str = Field(..., description="上传会话ID")
+    filename: str = Field(..., description="原始文件名")
+    file_size: int = Field(..., description="文件总大小（字节）")
+    offset: int = Field(..., description="已接收的字节数，下一块应从此处开始")
+    chunk_size: int = Field(..., description="建议的分块大小")
+    max_chunk_size: int = Field(..., description="单次上传允许的最大分块")
+    expires_at: datetime = Field(..., description="会话过期时间")
 
 
 class SubtitleEditRequest(BaseModel):
@@ -108,6 +130,49 @@ class SubtitleEditResponse(BaseModel):
     message: str = Field(..., description="响应消息")
     original_srt: Optional[str] = Field(None, description="编辑后的原始SRT")
     translated_srt: Optional[str] = Field(None, description="编辑后的翻译SRT")
+    translation_memory_hits: Optional[int] = Field(None, description="翻译记忆命中数")
+    translation_memory_misses: Optional[int] = Field(None, description="翻译记忆未命中数")
+
+
+class JobStatus(str, Enum):
+    """后台任务状态"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobSubmitResponse(BaseModel):
+    """任务提交响应"""
+    success: bool = Field(..., description="是否成功")
+    message: str = Field(..., description="响应消息")
+    job_id: Optional[str] = Field(None, description="任务ID")
+    status: Optional[JobStatus] = Field(None, description="任务状态")
+
+
+class JobStatusResponse(BaseModel):
+    """任务状态响应"""
+    job_id: str = Field(..., description="任务ID")
+    kind: str = Field(..., description="任务类型")
+    status: JobStatus = Field(..., description="任务状态")
+    stage: Optional[str] = Field(None, description="当前处理阶段")
+    message: Optional[str] = Field(None, description="状态消息")
+    progress: Dict[str, Any] = Field(default_factory=dict, description="当前阶段的进度信息")
+    created_at: datetime = Field(..., description="创建时间")
+    started_at: Optional[datetime] = Field(None, description="开始时间")
+    finished_at: Optional[datetime] = Field(None, description="结束时间")
+    result: Optional[SubtitleResponse] = Field(None, description="处理结果")
+
+
+class JobProgressEvent(BaseModel):
+    """任务进度事件（SSE推送）"""
+    job_id: str = Field(..., description="任务ID")
+    seq: int = Field(..., description="事件序号")
+    status: JobStatus = Field(..., description="任务状态")
+    stage: Optional[str] = Field(None, description="当前处理阶段")
+    message: Optional[str] = Field(None, description="状态消息")
+    progress: Dict[str, Any] = Field(default_factory=dict, description="当前阶段的进度信息")
 
 
 class HealthResponse(BaseModel):
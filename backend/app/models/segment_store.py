@@ -0,0 +1,170 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .schemas import SubtitleSegment
+
+
+class PackedStrings:
+    """紧凑字符串列：UTF-8字节缓冲区加偏移量数组"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._offsets = array('Q', [0])
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def append(self, text: str):
+        self._buffer += text.encode('utf-8')
+        self._offsets.append(len(self._buffer))
+
+    def extend(self, texts: Iterable[str]):
+        for text in texts:
+            self.append(text)
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        return self._buffer[self._offsets[index]:self._offsets[index + 1]].decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer) + self._offsets.itemsize * len(self._offsets)
+
+
+class SegmentStore:
+    """列式字幕片段容器，流水线内部使用，只在API边界转换为SubtitleSegment"""
+
+    def __init__(self):
+        self.starts = array('d')
+        self.ends = array('d')
+        self.confidences = array('f')
+        self._texts = PackedStrings()
+        # 译文列按需创建，未翻译的位置标记为0
+        self._translations: Optional[PackedStrings] = None
+        self._translated_mask: Optional[bytearray] = None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def append(self, text: str, start: float, end: float, confidence: float = 0.95):
+        """追加一个片段"""
+        self.starts.append(start)
+        self.ends.append(end)
+        self.confidences.append(confidence)
+        self._texts.append(text)
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[SubtitleSegment]) -> "SegmentStore":
+        store = cls()
+        translations = []
+        for segment in segments:
+            store.append(segment.text, segment.start, segment.end, segment.confidence)
+            translations.append(segment.translated_text)
+        if any(translation is not None for translation in translations):
+            store.set_translations(translations)
+        return store
+
+    @classmethod
+    def from_cues(cls, cues: Iterable[Any]) -> "SegmentStore":
+        """从SRT解析结果创建，cues元素包含start、end、text属性"""
+        store = cls()
+        for cue in cues:
+            store.append(cue.text, cue.start, cue.end)
+        return store
+
+    @classmethod
+    def concat(cls, stores: Sequence["SegmentStore"]) -> "SegmentStore":
+        """按开始时间合并多个容器（不保留译文）"""
+        order = sorted(
+            ((store.starts[i], n, i) for n, store in enumerate(stores) for i in range(len(store)))
+        )
+        merged = cls()
+        for _, n, i in order:
+            store = stores[n]
+            merged.append(store.text(i), store.starts[i], store.ends[i], store.confidences[i])
+        return merged
+
+    def shift(self, offset: float):
+        """将所有时间戳平移offset秒"""
+        for i in range(len(self)):
+            self.starts[i] += offset
+            self.ends[i] += offset
+
+    def text(self, index: int) -> str:
+        return self._texts[index]
+
+    def texts(self) -> List[str]:
+        return list(self._texts)
+
+    def translated_text(self, index: int) -> Optional[str]:
+        if self._translations is None or not self._translated_mask[index]:
+            return None
+        return self._translations[index]
+
+    def set_translations(self, translations: Sequence[Optional[str]]):
+        """一次性写入译文列，None表示该片段未翻译"""
+        if len(translations) != len(self):
+            raise ValueError(f"Expected {len(self)} translations, got {len(translations)}")
+
+        self._translations = PackedStrings()
+        self._translations.extend(translation or "" for translation in translations)
+        self._translated_mask = bytearray(translation is not None for translation in translations)
+
+    @property
+    def duration(self) -> float:
+        return self.ends[-1] - self.starts[0] if len(self) else 0.0
+
+    @property
+    def nbytes(self) -> int:
+        """内存占用估算"""
+        size = (
+            self.starts.itemsize * len(self.starts) +
+            self.ends.itemsize * len(self.ends) +
+            self.confidences.itemsize * len(self.confidences) +
+            self._texts.nbytes
+        )
+        if self._translations is not None:
+            size += self._translations.nbytes + len(self._translated_mask)
+        return size
+
+    def entries(self, is_translation: bool = False) -> Iterator[Tuple[float, float, str]]:
+        """生成(开始, 结束, 文本)序列，翻译模式下优先使用译文"""
+        for i in range(len(self)):
+            text = (self.translated_text(i) if is_translation else None) or self._texts[i]
+            yield self.starts[i], self.ends[i], text
+
+    def to_segments(self) -> List[SubtitleSegment]:
+        """在API边界转换为SubtitleSegment列表"""
+        return [
+            SubtitleSegment(
+                text=self._texts[i],
+                start=self.starts[i],
+                end=self.ends[i],
+                confidence=round(self.confidences[i], 4),
+                translated_text=self.translated_text(i)
+            )
+            for i in range(len(self))
+        ]
+
+    def to_columns(self) -> Dict[str, list]:
+        """转换为可JSON序列化的列数据（不含译文）"""
+        return {
+            "start": self.starts.tolist(),
+            "end": self.ends.tolist(),
+            "confidence": [round(c, 4) for c in self.confidences],
+            "text": self.texts()
+        }
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, list]) -> "SegmentStore":
+        store = cls()
+        store.starts.extend(columns["start"])
+        store.ends.extend(columns["end"])
+        store.confidences.extend(columns["confidence"])
+        store._texts.extend(columns["text"])
+        return store
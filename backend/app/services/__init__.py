@@ -1,10 +1,15 @@
 from .subtitle_service import AudioSubtitleService
 from .config_service import ConfigService
 from .file_service import FileService
+from .job_service import JobService
+from .service_registry import ServiceRegistry, service_registry
 
 
 __all__ = [
     "AudioSubtitleService",
     "ConfigService", 
-    "FileService"
+    "FileService",
+    "JobService",
+    "ServiceRegistry",
+    "service_registry"
 ]
\ No newline at end of file
@@ -0,0 +1,387 @@
+import asyncio
+import os
+import random
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+import aiofiles
+import httpx
+
+from ..models.schemas import APIConfig, LanguageCode
+from ..models.segment_store import SegmentStore
+
+
+# ASR语言参数映射
+ASR_LANGUAGE_MAP = {
+    LanguageCode.ZH: "zh-CN",
+    LanguageCode.EN: "en-US",
+    LanguageCode.AUTO: "zh-CN"
+}
+
+# 音频文件扩展名对应的Content-Type
+AUDIO_CONTENT_TYPES = {
+    '.mp3': 'audio/mpeg',
+    '.wav': 'audio/wav',
+    '.m4a': 'audio/mp4'
+}
+
+
+class ASRError(Exception):
+    """语音识别接口错误"""
+
+
+class ByteDanceASRClient:
+    """字节跳动语音识别异步客户端"""
+
+    def __init__(
+        self,
+        config: APIConfig,
+        max_connections: Optional[int] = None,
+        timeout: float = 60.0
+    ):
+        self.config = config
+        self.max_connections = max_connections or int(os.getenv("ASR_MAX_CONNECTIONS", "20"))
+        self.timeout = timeout
+        # 上传音频时每次从磁盘读取的字节数
+        self.upload_chunk_size = int(os.getenv("ASR_UPLOAD_CHUNK_SIZE", str(256 * 1024)))
+        # 识别参数，同时作为转录缓存键的一部分
+        self.words_per_line = 15
+        self.max_lines = 1
+        self.use_itn = True
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """惰性创建带连接池的HTTP客户端（需在事件循环中调用）"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return self._client
+
+    async def aclose(self):
+        """关闭连接池"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    @property
+    def auth_header(self) -> Dict[str, str]:
+        return {'Authorization': f'Bearer; {self.config.asr_access_token}'}
+
+    def get_language(self, source_language: LanguageCode) -> str:
+        """获取ASR语言参数"""
+        return ASR_LANGUAGE_MAP.get(source_language, "zh-CN")
+
+    def get_content_type(self, audio_file_path: str) -> str:
+        """根据扩展名检测音频Content-Type"""
+        return AUDIO_CONTENT_TYPES.get(Path(audio_file_path).suffix.lower(), 'audio/mpeg')
+
+    @property
+    def asr_params(self) -> Dict:
+        """影响识别结果的参数"""
+        return dict(
+            words_per_line=self.words_per_line,
+            max_lines=self.max_lines,
+            use_itn=self.use_itn,
+        )
+
+    def _submit_params(self, language: str) -> Dict:
+        return dict(
+            appid=self.config.asr_appid,
+            language=language,
+            use_itn=str(self.use_itn),
+            use_capitalize='True',
+            max_lines=self.max_lines,
+            words_per_line=self.words_per_line,
+        )
+
+    async def _submit(self, language: str, headers: Dict[str, str], **kwargs) -> str:
+        """提交识别任务，返回任务ID"""
+        response = await self.client.post(
+            f'{self.config.asr_base_url}/submit',
+            params=self._submit_params(language),
+            headers={**headers, **self.auth_header},
+            **kwargs
+        )
+
+        if response.status_code != 200:
+            raise ASRError(f"ByteDance API submit failed: {response.text}")
+
+        result = response.json()
+        if result.get('code') != 0:
+            raise ASRError(f"ByteDance API error: {result.get('message', 'Unknown error')}")
+
+        job_id = result.get('id')
+        if not job_id:
+            raise ASRError("ByteDance API did not return job ID")
+
+        return job_id
+
+    async def iter_file(self, audio_file_path: str) -> AsyncIterator[bytes]:
+        """按固定大小分块读取文件"""
+        async with aiofiles.open(audio_file_path, 'rb') as audio_file:
+            while True:
+                chunk = await audio_file.read(self.upload_chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    async def submit_file(
+        self,
+        audio_file_path: str,
+        source_language: LanguageCode = LanguageCode.AUTO,
+        content_type: Optional[str] = None
+    ) -> str:
+        """提交音频文件进行识别，请求体从磁盘流式读取；未指定content_type时按扩展名判断"""
+        file_size = (await asyncio.to_thread(os.stat, audio_file_path)).st_size
+
+        return await self._submit(
+            self.get_language(source_language),
+            headers={
+                'Content-Type': content_type or self.get_content_type(audio_file_path),
+                'Content-Length': str(file_size)
+            },
+            content=self.iter_file(audio_file_path)
+        )
+
+    async def submit_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        content_type: str,
+        source_language: LanguageCode = LanguageCode.AUTO
+    ) -> str:
+        """提交长度未知的音频流进行识别（分块传输编码）"""
+        return await self._submit(
+            self.get_language(source_language),
+            headers={'Content-Type': content_type},
+            content=chunks
+        )
+
+    async def submit_url(self, audio_url: str, source_language: LanguageCode = LanguageCode.AUTO) -> str:
+        """提交音频URL进行识别"""
+        return await self._submit(
+            self.get_language(source_language),
+            headers={'Content-Type': 'application/json'},
+            json={"url": audio_url}
+        )
+
+    async def query(self, job_id: str) -> Optional[List[Dict]]:
+        """查询识别结果，未完成时返回None"""
+        response = await self.client.get(
+            f'{self.config.asr_base_url}/query',
+            params=dict(
+                appid=self.config.asr_appid,
+                id=job_id,
+            ),
+            headers=self.auth_header
+        )
+
+        if response.status_code != 200:
+            raise ASRError(f"ByteDance API query failed: {response.text}")
+
+        result = response.json()
+        if result.get('code') == 0 and result.get('utterances'):
+            return result.get('utterances', [])
+
+        return None
+
+    @staticmethod
+    def parse_segments(utterances: List[Dict]) -> SegmentStore:
+        """将识别结果转换为列式字幕片段"""
+        segments = SegmentStore()
+
+        for utterance in utterances:
+            if utterance.get('attribute', {}).get('event') == 'speech':
+                segments.append(
+                    utterance.get('text', ''),
+                    utterance.get('start_time', 0) / 1000.0,
+                    utterance.get('end_time', 0) / 1000.0,
+                    0.95
+                )
+
+        return segments
+
+
+@dataclass
+class _PendingQuery:
+    """等待结果的ASR任务"""
+    job_id: str
+    future: asyncio.Future
+    timeout: float
+    deadline: float
+    base_interval: float
+    next_poll_at: float
+    attempt: int = 0
+    errors: int = 0
+    # 每次查询后结果仍未就绪时回调，参数为已查询次数
+    on_poll: Optional[Callable[[int], None]] = None
+
+
+class ASRPoller:
+    """集中式ASR结果轮询器 - 所有未完成任务共用一个轮询循环"""
+
+    def __init__(
+        self,
+        client: ByteDanceASRClient,
+        max_concurrent_queries: Optional[int] = None,
+        min_interval: float = 1.0,
+        max_interval: float = 15.0,
+        min_timeout: Optional[float] = None,
+        timeout_factor: float = 1.0,
+        max_errors: int = 3
+    ):
+        self.client = client
+        self.max_concurrent_queries = max_concurrent_queries or int(os.getenv("ASR_MAX_CONCURRENT_QUERIES", "10"))
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        # 时长未知时的超时时间，也是超时下限
+        self.min_timeout = min_timeout or float(os.getenv("ASR_MIN_TIMEOUT", "120"))
+        # 每秒音频额外允许的等待时间
+        self.timeout_factor = timeout_factor
+        self.max_errors = max_errors
+
+        self._pending: Dict[str, _PendingQuery] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def get_timeout(self, audio_duration: Optional[float] = None) -> float:
+        """根据音频时长计算超时时间"""
+        if not audio_duration:
+            return self.min_timeout
+        return self.min_timeout + audio_duration * self.timeout_factor
+
+    def get_base_interval(self, audio_duration: Optional[float] = None) -> float:
+        """根据音频时长计算初始轮询间隔，长音频无需频繁查询"""
+        if not audio_duration:
+            return self.min_interval * 2
+        return min(max(audio_duration * 0.02, self.min_interval), self.max_interval)
+
+    def _next_delay(self, pending: _PendingQuery) -> float:
+        """指数退避加随机抖动"""
+        delay = min(pending.base_interval * (1.5 ** pending.attempt), self.max_interval)
+        return delay * random.uniform(0.8, 1.2)
+
+    async def wait(
+        self,
+        job_id: str,
+        audio_duration: Optional[float] = None,
+        on_poll: Optional[Callable[[int], None]] = None
+    ) -> List[Dict]:
+        """登记ASR任务并等待识别结果"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        base_interval = self.get_base_interval(audio_duration)
+        timeout = self.get_timeout(audio_duration)
+
+        pending = _PendingQuery(
+            job_id=job_id,
+            future=loop.create_future(),
+            timeout=timeout,
+            deadline=now + timeout,
+            base_interval=base_interval,
+            next_poll_at=now + base_interval,
+            on_poll=on_poll
+        )
+        self._pending[job_id] = pending
+        self._ensure_running()
+
+        try:
+            return await pending.future
+        finally:
+            self._pending.pop(job_id, None)
+
+    def _ensure_running(self):
+        """惰性启动轮询循环，并唤醒以重新计算下次轮询时间"""
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_queries)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+        self._wakeup.set()
+
+    async def _run(self):
+        """轮询循环：只查询到期的任务"""
+        loop = asyncio.get_running_loop()
+
+        while self._pending:
+            now = loop.time()
+            due = [p for p in self._pending.values() if p.next_poll_at <= now and not p.future.done()]
+
+            if due:
+                await asyncio.gather(*(self._poll(p) for p in due))
+                continue
+
+            self._wakeup.clear()
+            next_poll_at = min(p.next_poll_at for p in self._pending.values())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(next_poll_at - now, 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, pending: _PendingQuery):
+        """查询单个任务并重新调度"""
+        loop = asyncio.get_running_loop()
+
+        try:
+            async with self._semaphore:
+                utterances = await self.client.query(pending.job_id)
+            pending.errors = 0
+        except Exception as e:
+            pending.errors += 1
+            if pending.errors >= self.max_errors:
+                self._resolve(pending, error=e)
+                return
+            utterances = None
+
+        if utterances is not None:
+            self._resolve(pending, result=utterances)
+            return
+
+        now = loop.time()
+        if now >= pending.deadline:
+            self._resolve(pending, error=ASRError(f"ByteDance API timeout after {pending.timeout:.0f} seconds"))
+            return
+
+        pending.attempt += 1
+        pending.next_poll_at = min(now + self._next_delay(pending), pending.deadline)
+
+        if pending.on_poll is not None:
+            try:
+                pending.on_poll(pending.attempt)
+            except Exception as e:
+                print(f"ASR poll callback error: {e}")
+
+    def _resolve(self, pending: _PendingQuery, result: Optional[List[Dict]] = None, error: Optional[Exception] = None):
+        """唤醒等待结果的流水线"""
+        self._pending.pop(pending.job_id, None)
+        if pending.future.done():
+            return
+
+        if error is not None:
+            pending.future.set_exception(error)
+        else:
+            pending.future.set_result(result)
+
+    async def aclose(self):
+        """停止轮询循环"""
+        for pending in list(self._pending.values()):
+            if not pending.future.done():
+                pending.future.cancel()
+        self._pending.clear()
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
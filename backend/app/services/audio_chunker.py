@@ -0,0 +1,107 @@
+import os
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional, Tuple
+
+import numpy as np
+import soundfile as sf
+
+
+@dataclass
+class AudioChunk:
+    """音频分片"""
+    index: int
+    start: float
+    end: float
+    path: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return self.end - self.start
+
+
+class AudioChunker:
+    """在低能量位置将长音频切分为多个分片"""
+
+    def __init__(
+        self,
+        chunk_seconds: Optional[float] = None,
+        search_window: float = 30.0,
+        frame_seconds: float = 0.1
+    ):
+        # 目标分片时长，实际切点在其附近的静音处
+        self.chunk_seconds = chunk_seconds or float(os.getenv("ASR_CHUNK_SECONDS", "300"))
+        # 在目标切点前后多少秒内寻找能量最低的帧
+        self.search_window = min(search_window, self.chunk_seconds / 4)
+        self.frame_seconds = frame_seconds
+
+    def should_split(self, duration: Optional[float]) -> bool:
+        """时长超过目标分片时长的1.5倍时才切分"""
+        return bool(duration) and duration > self.chunk_seconds * 1.5
+
+    def frame_energies(self, audio_file_path: str) -> np.ndarray:
+        """按帧计算RMS能量，逐块读取以保持内存恒定"""
+        info = sf.info(audio_file_path)
+        frame_len = max(int(info.samplerate * self.frame_seconds), 1)
+
+        energies = []
+        for block in sf.blocks(audio_file_path, blocksize=frame_len, dtype='float32', always_2d=True):
+            mono = block.mean(axis=1)
+            energies.append(float(np.sqrt(np.mean(mono * mono))) if len(mono) else 0.0)
+
+        return np.asarray(energies, dtype=np.float32)
+
+    async def stream_energies(self, pcm: AsyncIterator[bytes], sample_rate: int) -> Tuple[np.ndarray, float]:
+        """从16位单声道PCM流按帧计算RMS能量，返回(能量, 时长)，不保留音频数据"""
+        frame_bytes = max(int(sample_rate * self.frame_seconds), 1) * 2
+        energies: List[float] = []
+        pending = b''
+        total_bytes = 0
+
+        async for data in pcm:
+            total_bytes += len(data)
+            pending += data
+            usable = len(pending) - len(pending) % frame_bytes
+            if usable:
+                frames = np.frombuffer(pending[:usable], dtype='<i2').reshape(-1, frame_bytes // 2)
+                frames = frames.astype(np.float32) / 32768.0
+                energies.extend(np.sqrt(np.mean(frames * frames, axis=1)).tolist())
+                pending = pending[usable:]
+
+        tail = np.frombuffer(pending[:len(pending) - len(pending) % 2], dtype='<i2').astype(np.float32) / 32768.0
+        if len(tail):
+            energies.append(float(np.sqrt(np.mean(tail * tail))))
+
+        return np.asarray(energies, dtype=np.float32), total_bytes / 2 / sample_rate
+
+    def plan_chunks(self, audio_file_path: str) -> List[AudioChunk]:
+        """计算soundfile可读取的音频文件的分片边界"""
+        duration = sf.info(audio_file_path).duration
+        if not self.should_split(duration):
+            return [AudioChunk(index=0, start=0.0, end=duration)]
+
+        return self.plan_from_energies(duration, self.frame_energies(audio_file_path))
+
+    def plan_from_energies(self, duration: float, energies: np.ndarray) -> List[AudioChunk]:
+        """根据每帧能量在目标切点附近的静音处计算分片边界"""
+        if not self.should_split(duration):
+            return [AudioChunk(index=0, start=0.0, end=duration)]
+
+        window_frames = int(self.search_window / self.frame_seconds)
+
+        cuts = [0.0]
+        while duration - cuts[-1] > self.chunk_seconds * 1.5:
+            target_frame = int((cuts[-1] + self.chunk_seconds) / self.frame_seconds)
+            lo = max(target_frame - window_frames, 0)
+            hi = min(target_frame + window_frames, len(energies))
+            if hi <= lo:
+                break
+
+            # 选择窗口内能量最低的帧作为切点，避免切断语音
+            cut_frame = lo + int(np.argmin(energies[lo:hi]))
+            cuts.append(cut_frame * self.frame_seconds)
+        cuts.append(duration)
+
+        return [
+            AudioChunk(index=i, start=start, end=end)
+            for i, (start, end) in enumerate(zip(cuts[:-1], cuts[1:]))
+        ]
@@ -0,0 +1,204 @@
+import asyncio
+import os
+import re
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+
+# 管道输出的压缩格式：编码参数和Content-Type，16kHz单声道语音用低码率即可
+STREAM_FORMATS = {
+    "mp3": (["-c:a", "libmp3lame", "-b:a", "32k", "-f", "mp3"], "audio/mpeg"),
+    "ogg": (["-c:a", "libopus", "-b:a", "24k", "-f", "ogg"], "audio/ogg"),
+}
+
+_DURATION_RE = re.compile(r'Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+
+
+class FFmpegError(Exception):
+    """FFmpeg执行失败"""
+
+
+class AudioStream:
+    """ffmpeg标准输出上的压缩音频流，可直接作为HTTP请求体迭代"""
+
+    def __init__(self, runner: "FFmpegRunner", args: List[str], content_type: str, chunk_size: int = 64 * 1024):
+        self.runner = runner
+        self.args = [*args, 'pipe:1']
+        self.content_type = content_type
+        self.chunk_size = chunk_size
+        # 输出结束后可用：源文件时长和已输出字节数
+        self.duration: Optional[float] = None
+        self.size = 0
+        self._process: Optional[asyncio.subprocess.Process] = None
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async with self.runner.limit():
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    'ffmpeg', '-nostdin', '-hide_banner', *self.args,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            except FileNotFoundError:
+                raise FFmpegError("FFmpeg not found. Please install FFmpeg to process video files.")
+
+            # 同时读取stderr，避免管道写满阻塞ffmpeg
+            stderr_task = asyncio.create_task(self._process.stderr.read())
+            try:
+                while True:
+                    chunk = await self._process.stdout.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    self.size += len(chunk)
+                    yield chunk
+                await self._process.wait()
+            finally:
+                await self.aclose()
+                stderr = (await stderr_task).decode('utf-8', errors='replace')
+
+        match = _DURATION_RE.search(stderr)
+        if match:
+            hours, minutes, seconds = match.groups()
+            self.duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+        if self._process.returncode != 0:
+            raise FFmpegError(f"FFmpeg error: {stderr.strip()[-1000:]}")
+
+    async def aclose(self):
+        """请求中断或任务取消时终止ffmpeg进程"""
+        if self._process is not None and self._process.returncode is None:
+            self._process.kill()
+            await self._process.wait()
+
+
+class FFmpegRunner:
+    """异步FFmpeg执行器 - 限制并发进程数，任务取消时终止进程并清理中间文件"""
+
+    def __init__(self, max_concurrent: Optional[int] = None, temp_dir: Optional[str] = None):
+        self.max_concurrent = max_concurrent or int(os.getenv("FFMPEG_MAX_CONCURRENT", "2"))
+        # 中间音频文件目录，默认使用系统临时目录
+        self.temp_dir = temp_dir or os.getenv("FFMPEG_TEMP_DIR") or None
+        if self.temp_dir:
+            os.makedirs(self.temp_dir, exist_ok=True)
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def limit(self) -> asyncio.Semaphore:
+        """限制同时运行的ffmpeg进程数"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def run(self, args: List[str]) -> str:
+        """执行ffmpeg命令，返回stderr输出；被取消时终止进程"""
+        async with self.limit():
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    'ffmpeg', '-nostdin', '-hide_banner', *args,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            except FileNotFoundError:
+                raise FFmpegError("FFmpeg not found. Please install FFmpeg to process video files.")
+
+            try:
+                _, stderr = await process.communicate()
+            except asyncio.CancelledError:
+                process.kill()
+                await process.wait()
+                raise
+
+        output = stderr.decode('utf-8', errors='replace')
+        if process.returncode != 0:
+            # 只保留最后几行错误信息
+            raise FFmpegError(f"FFmpeg error: {output.strip()[-1000:]}")
+
+        return output
+
+    async def extract_audio(self, video_path: str, output_path: str):
+        """提取16kHz单声道PCM音频"""
+        await self.run([
+            '-i', video_path, '-vn', '-acodec', 'pcm_s16le',
+            '-ar', '16000', '-ac', '1', '-y', output_path
+        ])
+
+        if not os.path.exists(output_path):
+            raise FFmpegError("Failed to extract audio from video")
+
+    async def copy_audio(self, video_path: str, output_path: str):
+        """不重新编码，将第一条音轨复制到m4a容器（用于AAC音轨）"""
+        await self.run([
+            '-i', video_path, '-vn', '-map', '0:a:0', '-c:a', 'copy', '-f', 'ipod', '-y', output_path
+        ])
+
+        if not os.path.exists(output_path):
+            raise FFmpegError("Failed to copy audio track from video")
+
+    async def cut_audio(
+        self,
+        media_path: str,
+        start: float,
+        duration: float,
+        output_path: str,
+        audio_format: str = "mp3"
+    ) -> str:
+        """截取[start, start + duration)区间的音频，转为16kHz单声道压缩音频，返回Content-Type"""
+        if audio_format not in STREAM_FORMATS:
+            raise ValueError(f"Unsupported audio chunk format: {audio_format}")
+        
+        codec_args, content_type = STREAM_FORMATS[audio_format]
+        # -ss放在-i之前按输入定位，只解码需要的区间
+        await self.run([
+            '-ss', f'{start:.3f}', '-t', f'{duration:.3f}', '-i', media_path,
+            '-vn', '-map', '0:a:0', '-ac', '1', '-ar', '16000', *codec_args, '-y', output_path
+        ])
+        
+        if not os.path.exists(output_path):
+            raise FFmpegError("Failed to cut audio chunk")
+        return content_type
+
+    def audio_stream(self, video_path: str, audio_format: str = "mp3") -> AudioStream:
+        """将视频中的音频压缩编码后经管道输出，不写入磁盘"""
+        if audio_format not in STREAM_FORMATS:
+            raise ValueError(f"Unsupported audio stream format: {audio_format}")
+
+        codec_args, content_type = STREAM_FORMATS[audio_format]
+        return AudioStream(
+            self, ['-i', video_path, '-vn', '-map', '0:a:0', '-ac', '1', '-ar', '16000', *codec_args], content_type
+        )
+
+    def pcm_stream(self, media_path: str, sample_rate: int = 16000) -> AudioStream:
+        """将第一条音轨解码为16位单声道PCM经管道输出，用于分析切分点"""
+        return AudioStream(
+            self, ['-i', media_path, '-vn', '-map', '0:a:0', '-ac', '1', '-ar', str(sample_rate), '-f', 's16le'],
+            "audio/L16"
+        )
+
+    def copy_stream(self, video_path: str) -> AudioStream:
+        """不重新编码，将MP3音轨直接经管道输出"""
+        return AudioStream(
+            self, ['-i', video_path, '-vn', '-map', '0:a:0', '-c:a', 'copy', '-f', 'mp3'], "audio/mpeg"
+        )
+
+    @asynccontextmanager
+    async def extracted_audio(self, video_path: str, stream_copy: bool = False) -> AsyncIterator[str]:
+        """提取音频到临时文件，退出时（包括失败和取消）删除该文件
+
+        stream_copy为True时复制原音轨到m4a，否则转码为16kHz单声道WAV
+        """
+        suffix = ".m4a" if stream_copy else ".wav"
+        fd, audio_path = tempfile.mkstemp(prefix="extracted_", suffix=suffix, dir=self.temp_dir)
+        os.close(fd)
+
+        try:
+            if stream_copy:
+                await self.copy_audio(video_path, audio_path)
+            else:
+                await self.extract_audio(video_path, audio_path)
+            yield audio_path
+        finally:
+            try:
+                os.remove(audio_path)
+            except FileNotFoundError:
+                pass
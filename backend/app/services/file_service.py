@@ -1,23 +1,32 @@
-import os
+import threading
+import time
 import uuid
+import hashlib
 import aiofiles
-from typing import List, Optional
+from typing import Dict, Optional, Set, Tuple
 from pathlib import Path
-from fastapi import UploadFile, HTTPException
+from fastapi import UploadFile
 from ..models.schemas import FileUploadResponse
+from .upload_index import UploadIndex, UploadRecord
 
 
 class FileService:
     """文件服务"""
     
-    def __init__(self, upload_dir: str = "uploads"):
+    def __init__(self, upload_dir: str = "uploads", index: Optional[UploadIndex] = None):
         self.upload_dir = Path(upload_dir)
         self.upload_dir.mkdir(exist_ok=True)
+        # file_id到文件记录的索引，避免每次查询都扫描上传目录
+        self.index = index or UploadIndex()
+        # 正在被任务使用的文件（引用计数），回收时跳过
+        self._pins: Dict[str, int] = {}
+        self._pins_lock = threading.Lock()
         
         # 支持的文件扩展名
         self.allowed_audio_extensions = {'.mp3', '.wav', '.m4a', '.flac', '.ogg'}
         self.allowed_video_extensions = {'.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm'}
         self.max_file_size = 100 * 1024 * 1024  # 100MB
+        self.chunk_size = 1024 * 1024  # 每次复制1MB
     
     def is_allowed_file(self, filename: str) -> bool:
         """检查文件是否允许上传"""
@@ -35,12 +44,8 @@ class FileService:
     async def save_file(self, file: UploadFile) -> FileUploadResponse:
         """保存上传的文件"""
         try:
-            # 检查文件大小
-            file.file.seek(0, 2)  # 移动到文件末尾
-            file_size = file.file.tell()
-            file.file.seek(0)  # 重置到文件开头
-            
-            if file_size > self.max_file_size:
+            # 已知大小时提前拒绝，否则在复制过程中检查
+            if file.size is not None and file.size > self.max_file_size:
                 return FileUploadResponse(
                     success=False,
                     message=f"File size exceeds maximum limit of {self.max_file_size // (1024 * 1024)}MB"
@@ -54,25 +59,17 @@ class FileService:
                 )
             
             # 生成唯一文件名
-            file_id = str(uuid.uuid4())
-            file_ext = Path(file.filename).suffix
-            safe_filename = f"{file_id}{file_ext}"
-            file_path = self.upload_dir / safe_filename
+            file_id, file_path = self.new_file_path(file.filename)
             
-            # 保存文件
-            async with aiofiles.open(file_path, 'wb') as buffer:
-                content = await file.read()
-                await buffer.write(content)
+            # 分块保存文件，同时计算哈希并检查大小
+            file_size, file_hash = await self._write_stream(file, file_path)
+            if file_size is None:
+                return FileUploadResponse(
+                    success=False,
+                    message=f"File size exceeds maximum limit of {self.max_file_size // (1024 * 1024)}MB"
+                )
             
-            return FileUploadResponse(
-                success=True,
-                message="File uploaded successfully",
-                file_id=file_id,
-                filename=file.filename,
-                file_size=file_size,
-                file_type=file.content_type,
-                is_video=self.is_video_file(file.filename)
-            )
+            return self.register_file(file_id, file_path, file.filename, file_size, file_hash, file.content_type)
             
         except Exception as e:
             return FileUploadResponse(
@@ -80,56 +77,148 @@ class FileService:
                 message=f"Error saving file: {str(e)}"
             )
     
-    def get_file_path(self, file_id: str) -> Optional[Path]:
-        """获取文件路径"""
-        # 查找文件
-        for file_path in self.upload_dir.glob(f"{file_id}.*"):
-            if file_path.exists():
-                return file_path
-        return None
+    def new_file_path(self, filename: str) -> Tuple[str, Path]:
+        """为上传文件分配唯一ID和存储路径"""
+        file_id = str(uuid.uuid4())
+        return file_id, self.upload_dir / f"{file_id}{Path(filename).suffix}"
+    
+    def register_file(
+        self,
+        file_id: str,
+        file_path: Path,
+        filename: str,
+        file_size: int,
+        file_hash: Optional[str],
+        content_type: Optional[str]
+    ) -> FileUploadResponse:
+        """将已写入上传目录的文件登记到索引，内容与已有文件相同时删除新文件并共享已有文件"""
+        now = time.time()
+        record = self.index.add(UploadRecord(
+            file_id=file_id,
+            path=str(file_path),
+            filename=filename,
+            file_size=file_size,
+            file_hash=file_hash,
+            content_type=content_type,
+            is_video=self.is_video_file(filename),
+            created_at=now,
+            modified_at=now
+        ))
+        
+        deduplicated = record.path != str(file_path)
+        if deduplicated:
+            file_path.unlink(missing_ok=True)
+        
+        return FileUploadResponse(
+            success=True,
+            message="File uploaded successfully",
+            file_id=file_id,
+            filename=filename,
+            file_size=file_size,
+            file_type=content_type,
+            is_video=self.is_video_file(filename),
+            file_hash=file_hash,
+            deduplicated=deduplicated
+        )
+    
+    async def _write_stream(self, file: UploadFile, file_path: Path) -> Tuple[Optional[int], Optional[str]]:
+        """分块写入文件，返回(文件大小, SHA-256)；超过大小限制时删除部分文件并返回(None, None)"""
+        hasher = hashlib.sha256()
+        file_size = 0
+        
+        try:
+            async with aiofiles.open(file_path, 'wb') as buffer:
+                while True:
+                    chunk = await file.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    
+                    file_size += len(chunk)
+                    if file_size > self.max_file_size:
+                        break
+                    
+                    hasher.update(chunk)
+                    await buffer.write(chunk)
+        except Exception:
+            file_path.unlink(missing_ok=True)
+            raise
+        
+        if file_size > self.max_file_size:
+            file_path.unlink(missing_ok=True)
+            return None, None
+        
+        return file_size, hasher.hexdigest()
+    
+    def get_record(self, file_id: str) -> Optional[UploadRecord]:
+        """获取文件索引记录"""
+        return self.index.get(file_id)
+    
+    def _remove(self, file_id: str) -> Optional[UploadRecord]:
+        """删除记录，没有其他记录引用时删除存储文件"""
+        record = self.index.remove(file_id)
+        if record is not None and not self.index.is_referenced(record.path):
+            Path(record.path).unlink(missing_ok=True)
+        return record
+    
+    def acquire_file(self, file_id: str) -> Optional[UploadRecord]:
+        """登记文件被任务使用，使用结束后需调用release_file"""
+        with self._pins_lock:
+            record = self.index.get(file_id)
+            if record is None:
+                return None
+            self._pins[file_id] = self._pins.get(file_id, 0) + 1
+        
+        self.index.touch(file_id, time.time())
+        return record
+    
+    def release_file(self, file_id: str):
+        """任务结束，解除文件占用"""
+        with self._pins_lock:
+            count = self._pins.get(file_id, 0) - 1
+            if count > 0:
+                self._pins[file_id] = count
+            else:
+                self._pins.pop(file_id, None)
+    
+    def pinned_files(self) -> Set[str]:
+        """正在被任务使用的文件ID"""
+        with self._pins_lock:
+            return set(self._pins)
+    
+    def delete_if_unused(self, file_id: str) -> Optional[UploadRecord]:
+        """文件未被任务使用时删除，返回被删除的记录"""
+        with self._pins_lock:
+            if file_id in self._pins:
+                return None
+            return self._remove(file_id)
     
     def delete_file(self, file_id: str) -> bool:
         """删除文件"""
-        file_path = self.get_file_path(file_id)
-        if file_path and file_path.exists():
-            try:
-                file_path.unlink()
-                return True
-            except Exception:
-                return False
-        return False
-    
-    def cleanup_temp_files(self):
-        """清理临时文件"""
         try:
-            # 删除超过1小时的文件
-            import time
-            current_time = time.time()
-            
-            for file_path in self.upload_dir.glob("*"):
-                if file_path.is_file():
-                    file_age = current_time - file_path.stat().st_mtime
-                    if file_age > 3600:  # 1小时
-                        try:
-                            file_path.unlink()
-                            print(f"Deleted old file: {file_path}")
-                        except Exception as e:
-                            print(f"Error deleting file {file_path}: {e}")
-        except Exception as e:
-            print(f"Error during cleanup: {e}")
+            return self._remove(file_id) is not None
+        except Exception:
+            return False
+    
+    def rebuild_index(self):
+        """启动时与上传目录对账"""
+        result = self.index.rebuild(self.upload_dir, self.is_video_file)
+        print(f"Upload index rebuilt: {result['entries']} files ({result['added']} added, {result['removed']} removed)")
     
     def get_file_info(self, file_id: str) -> Optional[dict]:
         """获取文件信息"""
-        file_path = self.get_file_path(file_id)
-        if not file_path or not file_path.exists():
+        record = self.index.get(file_id)
+        if not record:
             return None
         
-        stat = file_path.stat()
         return {
             'file_id': file_id,
-            'filename': file_path.name,
-            'file_size': stat.st_size,
-            'created_time': stat.st_ctime,
-            'modified_time': stat.st_mtime,
-            'is_video': self.is_video_file(file_path.name)
+            # 去重后的记录共享其他上传的存储文件，文件名按本记录的ID生成
+            'filename': f"{file_id}{Path(record.filename).suffix}",
+            'original_filename': record.filename,
+            'file_size': record.file_size,
+            'file_hash': record.file_hash,
+            'content_type': record.content_type,
+            'created_time': record.created_at,
+            'modified_time': record.modified_at,
+            'is_video': record.is_video
         }
\ No newline at end of file
@@ -0,0 +1,252 @@
+import asyncio
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ..models.schemas import JobProgressEvent, JobStatus, JobStatusResponse, SubtitleResponse
+
+
+FINISHED_STATUSES = (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+
+class JobQueueFullError(Exception):
+    """任务队列已满"""
+
+
+@dataclass
+class Job:
+    """后台处理任务"""
+    job_id: str
+    kind: str
+    func: Callable[["Job"], Awaitable[SubtitleResponse]]
+    status: JobStatus = JobStatus.PENDING
+    stage: Optional[str] = "queued"
+    message: Optional[str] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+    seq: int = 0
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[SubtitleResponse] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    task: Optional[asyncio.Task] = None
+    finished_monotonic: Optional[float] = None
+    # 进度事件订阅者（SSE连接），每个订阅者一个队列
+    subscribers: List[asyncio.Queue] = field(default_factory=list)
+    # 任务结束（包括排队时被取消）后执行的回调
+    callbacks: List[Callable[["Job"], None]] = field(default_factory=list)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def set_stage(self, stage: str, message: Optional[str] = None, **progress: Any):
+        """更新当前处理阶段和进度，并通知订阅者"""
+        self.stage = stage
+        if message is not None:
+            self.message = message
+        self.progress = progress
+        self.publish()
+
+    def add_done_callback(self, callback: Callable[["Job"], None]):
+        """登记任务结束回调，任务已结束时立即执行"""
+        if self.is_finished:
+            callback(self)
+        else:
+            self.callbacks.append(callback)
+
+    def to_event(self) -> JobProgressEvent:
+        """当前状态快照"""
+        return JobProgressEvent(
+            job_id=self.job_id,
+            seq=self.seq,
+            status=self.status,
+            stage=self.stage,
+            message=self.message,
+            progress=self.progress
+        )
+
+    def subscribe(self, max_events: int = 100) -> asyncio.Queue:
+        """订阅进度事件"""
+        queue = asyncio.Queue(maxsize=max_events)
+        self.subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        """取消订阅"""
+        if queue in self.subscribers:
+            self.subscribers.remove(queue)
+
+    def publish(self):
+        """向所有订阅者推送当前状态，消费过慢时丢弃最旧的事件"""
+        self.seq += 1
+        event = self.to_event()
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def to_response(self) -> JobStatusResponse:
+        """转换为API响应"""
+        return JobStatusResponse(
+            job_id=self.job_id,
+            kind=self.kind,
+            status=self.status,
+            stage=self.stage,
+            message=self.message,
+            progress=self.progress,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            result=self.result
+        )
+
+
+class JobService:
+    """后台任务服务 - 有界工作池执行字幕处理流水线"""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue_size: Optional[int] = None,
+        result_ttl: Optional[int] = None
+    ):
+        self.max_workers = max_workers or int(os.getenv("JOB_MAX_WORKERS", "4"))
+        self.max_queue_size = max_queue_size or int(os.getenv("JOB_MAX_QUEUE_SIZE", "100"))
+        # 已完成任务的结果保留时间（秒）
+        self.result_ttl = result_ttl or int(os.getenv("JOB_RESULT_TTL", "3600"))
+
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    def _ensure_workers(self):
+        """在事件循环中惰性启动工作协程"""
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+
+        if not self._workers:
+            self._workers = [
+                asyncio.create_task(self._worker(i))
+                for i in range(self.max_workers)
+            ]
+            print(f"Started {self.max_workers} job workers")
+
+    def submit(self, kind: str, func: Callable[[Job], Awaitable[SubtitleResponse]]) -> Job:
+        """提交任务，立即返回任务对象"""
+        self._ensure_workers()
+        self._purge_expired()
+
+        job = Job(job_id=str(uuid.uuid4()), kind=kind, func=func)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFullError(f"Job queue is full ({self.max_queue_size} pending jobs)")
+
+        self.jobs[job.job_id] = job
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """获取任务"""
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """取消任务"""
+        job = self.jobs.get(job_id)
+        if not job or job.is_finished:
+            return False
+
+        if job.status == JobStatus.PENDING:
+            # 尚未开始的任务直接标记为已取消，工作协程取出后会跳过
+            self._finish(job, JobStatus.CANCELLED, "Job cancelled")
+        elif job.task:
+            job.task.cancel()
+
+        return True
+
+    async def shutdown(self):
+        """停止所有工作协程"""
+        for worker in self._workers:
+            worker.cancel()
+
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+
+        self._workers = []
+        self._queue = None
+
+    async def _worker(self, worker_id: int):
+        """工作协程：从队列中取出任务并执行"""
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.status == JobStatus.PENDING:
+                    await self._run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job worker {worker_id} error: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job: Job):
+        """执行单个任务"""
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.now()
+        job.set_stage("processing")
+        job.task = asyncio.create_task(job.func(job))
+
+        try:
+            # 使用wait而不是直接await，以区分任务被取消和工作协程被取消
+            await asyncio.wait({job.task})
+        except asyncio.CancelledError:
+            job.task.cancel()
+            self._finish(job, JobStatus.CANCELLED, "Job cancelled by server shutdown")
+            raise
+
+        if job.task.cancelled():
+            self._finish(job, JobStatus.CANCELLED, "Job cancelled")
+            return
+
+        error = job.task.exception()
+        if error:
+            self._finish(job, JobStatus.FAILED, f"Job failed: {str(error)}")
+            return
+
+        job.result = job.task.result()
+        if job.result and job.result.success:
+            self._finish(job, JobStatus.COMPLETED, job.result.message)
+        else:
+            self._finish(job, JobStatus.FAILED, job.result.message if job.result else "Job returned no result")
+
+    def _finish(self, job: Job, status: JobStatus, message: str):
+        """标记任务结束"""
+        job.status = status
+        job.message = message
+        job.stage = status.value
+        job.finished_at = datetime.now()
+        job.finished_monotonic = time.monotonic()
+        job.task = None
+        job.progress = {}
+        job.done.set()
+        job.publish()
+
+        for callback in job.callbacks:
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"Job callback error: {e}")
+        job.callbacks = []
+
+    def _purge_expired(self):
+        """清理过期的已完成任务"""
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_monotonic is not None and now - job.finished_monotonic > self.result_ttl
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
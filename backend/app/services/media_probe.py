@@ -0,0 +1,158 @@
+import asyncio
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Optional, Tuple
+
+
+# ASR可以直接接收的(容器, 编码)组合及对应的Content-Type
+PASSTHROUGH_FORMATS = {
+    ("mp3", "mp3"): "audio/mpeg",
+    ("wav", "pcm_s16le"): "audio/wav",
+    ("m4a", "aac"): "audio/mp4",
+}
+
+# 可以不重新编码、直接复制音轨的编码
+COPY_CODECS = {"mp3", "aac"}
+
+# 直接上传或复制音轨时允许的采样率和声道数
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 48000
+MAX_CHANNELS = 2
+
+
+class MediaStrategy(str, Enum):
+    """音频准备方式，按开销从低到高"""
+    PASSTHROUGH = "passthrough"
+    COPY = "copy"
+    TRANSCODE = "transcode"
+
+
+@dataclass
+class MediaInfo:
+    """ffprobe探测结果（只取第一条音轨）"""
+    format_name: str
+    duration: Optional[float]
+    has_video: bool
+    audio_codec: Optional[str]
+    sample_rate: Optional[int]
+    channels: Optional[int]
+
+    @classmethod
+    def from_ffprobe(cls, data: Dict) -> "MediaInfo":
+        streams = data.get("streams", [])
+        audio = next((s for s in streams if s.get("codec_type") == "audio"), {})
+        # 封面图片也是视频流，不算作视频
+        has_video = any(
+            s.get("codec_type") == "video" and not s.get("disposition", {}).get("attached_pic")
+            for s in streams
+        )
+        duration = data.get("format", {}).get("duration") or audio.get("duration")
+
+        return cls(
+            format_name=data.get("format", {}).get("format_name", ""),
+            duration=float(duration) if duration else None,
+            has_video=has_video,
+            audio_codec=audio.get("codec_name"),
+            sample_rate=int(audio["sample_rate"]) if audio.get("sample_rate") else None,
+            channels=audio.get("channels")
+        )
+
+    @property
+    def audio_acceptable(self) -> bool:
+        """采样率和声道数是否可以不经重采样直接送给ASR"""
+        return (
+            self.sample_rate is not None and MIN_SAMPLE_RATE <= self.sample_rate <= MAX_SAMPLE_RATE and
+            self.channels is not None and self.channels <= MAX_CHANNELS
+        )
+
+    @property
+    def passthrough_content_type(self) -> Optional[str]:
+        """文件本身可以直接上传时返回Content-Type"""
+        if self.has_video or not self.audio_acceptable:
+            return None
+
+        formats = set(self.format_name.split(','))
+        for (container, codec), content_type in PASSTHROUGH_FORMATS.items():
+            if container in formats and codec == self.audio_codec:
+                return content_type
+        return None
+
+
+def choose_strategy(info: Optional[MediaInfo], is_video: bool) -> MediaStrategy:
+    """选择开销最低的音频准备方式，无法探测时按扩展名判断"""
+    if info is None:
+        return MediaStrategy.TRANSCODE if is_video else MediaStrategy.PASSTHROUGH
+
+    if info.audio_codec is None:
+        raise ValueError("No audio track found in media file")
+
+    if info.passthrough_content_type:
+        return MediaStrategy.PASSTHROUGH
+    if info.audio_codec in COPY_CODECS and info.audio_acceptable:
+        return MediaStrategy.COPY
+    return MediaStrategy.TRANSCODE
+
+
+class MediaProbe:
+    """使用ffprobe探测媒体信息，结果按文件路径、大小和修改时间缓存"""
+
+    def __init__(self, max_entries: Optional[int] = None, timeout: float = 30.0):
+        self.max_entries = max_entries or int(os.getenv("MEDIA_PROBE_CACHE_SIZE", "256"))
+        self.timeout = timeout
+        self._cache: "OrderedDict[Tuple, MediaInfo]" = OrderedDict()
+
+    async def probe(self, path: str) -> Optional[MediaInfo]:
+        """探测媒体信息，ffprobe不可用或无法识别时返回None"""
+        try:
+            stat = await asyncio.to_thread(os.stat, path)
+        except OSError:
+            return None
+
+        key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        info = await self._run_ffprobe(path)
+        if info is not None:
+            self._cache[key] = info
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+        return info
+
+    async def _run_ffprobe(self, path: str) -> Optional[MediaInfo]:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            print("ffprobe not found, falling back to extension-based media handling")
+            return None
+
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            print(f"ffprobe timed out for {path}")
+            return None
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+
+        if process.returncode != 0:
+            print(f"ffprobe failed for {path}: {stderr.decode('utf-8', errors='replace').strip()}")
+            return None
+
+        try:
+            return MediaInfo.from_ffprobe(json.loads(stdout))
+        except (ValueError, KeyError) as e:
+            print(f"Failed to parse ffprobe output for {path}: {e}")
+            return None
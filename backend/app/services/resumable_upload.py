@@ -0,0 +1,247 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Dict, Optional
+
+import aiofiles
+
+from ..models.schemas import FileUploadResponse, UploadSessionResponse
+from ..utils.helpers import hash_file
+from .file_service import FileService
+
+
+class UploadSessionNotFound(Exception):
+    """上传会话不存在或已过期"""
+
+
+class UploadOffsetMismatch(Exception):
+    """分块偏移与服务端已接收的字节数不一致"""
+
+    def __init__(self, offset: int):
+        super().__init__(f"Upload offset mismatch, server has {offset} bytes")
+        self.offset = offset
+
+
+class UploadTooLarge(Exception):
+    """文件或分块超过大小限制"""
+
+
+@dataclass
+class UploadSession:
+    """分块上传会话，部分文件保存在 .partial 目录中"""
+    session_id: str
+    filename: str
+    total_size: int
+    content_type: Optional[str]
+    received: int = 0
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    # 增量计算的哈希，服务重启后丢失，完成时重新计算
+    hasher: Optional["hashlib._Hash"] = None
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def to_meta(self) -> Dict:
+        return {
+            "session_id": self.session_id,
+            "filename": self.filename,
+            "total_size": self.total_size,
+            "content_type": self.content_type,
+            "created_at": self.created_at
+        }
+
+
+class ResumableUploadService:
+    """可断点续传的分块上传 - 创建会话、按偏移追加分块、完成后登记为普通上传文件"""
+
+    def __init__(
+        self,
+        file_service: FileService,
+        max_file_size: Optional[int] = None,
+        session_ttl: Optional[float] = None
+    ):
+        self.file_service = file_service
+        self.max_file_size = max_file_size or int(
+            os.getenv("RESUMABLE_MAX_FILE_SIZE", str(4 * 1024 * 1024 * 1024))
+        )
+        # 建议客户端使用的分块大小和单次请求允许的最大分块
+        self.chunk_size = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+        self.max_chunk_size = int(os.getenv("UPLOAD_MAX_CHUNK_SIZE", str(16 * 1024 * 1024)))
+        # 会话在最后一次写入后保留的时间（秒）
+        self.session_ttl = session_ttl or float(os.getenv("RESUMABLE_SESSION_TTL", str(24 * 3600)))
+
+        # 与上传目录位于同一文件系统，完成时可以直接重命名
+        self.partial_dir = file_service.upload_dir / ".partial"
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        self._sessions: Dict[str, UploadSession] = {}
+        self._load_sessions()
+
+    def _part_path(self, session_id: str) -> Path:
+        return self.partial_dir / f"{session_id}.part"
+
+    def _meta_path(self, session_id: str) -> Path:
+        return self.partial_dir / f"{session_id}.json"
+
+    def _load_sessions(self):
+        """启动时恢复未完成的会话，已接收字节数以部分文件大小为准"""
+        for meta_path in self.partial_dir.glob("*.json"):
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                part_path = self._part_path(meta["session_id"])
+                stat = part_path.stat()
+            except (OSError, ValueError, KeyError):
+                continue
+
+            self._sessions[meta["session_id"]] = UploadSession(
+                **meta, received=stat.st_size, updated_at=stat.st_mtime
+            )
+
+        self.purge_expired()
+        if self._sessions:
+            print(f"Restored {len(self._sessions)} resumable upload sessions")
+
+    def _remove_files(self, session_id: str):
+        self._part_path(session_id).unlink(missing_ok=True)
+        self._meta_path(session_id).unlink(missing_ok=True)
+
+    def purge_expired(self) -> int:
+        """删除超过TTL未更新的会话及其部分文件"""
+        now = time.time()
+        expired = [
+            session for session in self._sessions.values()
+            if now - session.updated_at > self.session_ttl and not session.lock.locked()
+        ]
+        for session in expired:
+            self._sessions.pop(session.session_id, None)
+            self._remove_files(session.session_id)
+        return len(expired)
+
+    def get(self, session_id: str) -> UploadSession:
+        """获取会话"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            raise UploadSessionNotFound(f"Upload session {session_id} not found")
+        return session
+
+    def to_response(self, session: UploadSession) -> UploadSessionResponse:
+        return UploadSessionResponse(
+            session_id=session.session_id,
+            filename=session.filename,
+            file_size=session.total_size,
+            offset=session.received,
+            chunk_size=self.chunk_size,
+            max_chunk_size=self.max_chunk_size,
+            expires_at=datetime.fromtimestamp(session.updated_at + self.session_ttl)
+        )
+
+    def create(self, filename: str, total_size: int, content_type: Optional[str] = None) -> UploadSession:
+        """创建上传会话"""
+        if not self.file_service.is_allowed_file(filename):
+            raise ValueError(
+                "File type not allowed. Supported formats: MP3, WAV, M4A, FLAC, OGG, MP4, AVI, MOV, MKV, WMV, FLV, WEBM"
+            )
+        if total_size > self.max_file_size:
+            raise UploadTooLarge(f"File size exceeds maximum limit of {self.max_file_size // (1024 * 1024)}MB")
+
+        self.purge_expired()
+
+        session = UploadSession(
+            session_id=str(uuid.uuid4()),
+            filename=filename,
+            total_size=total_size,
+            content_type=content_type,
+            hasher=hashlib.sha256()
+        )
+        self._part_path(session.session_id).touch()
+        self._meta_path(session.session_id).write_text(json.dumps(session.to_meta()), encoding="utf-8")
+        self._sessions[session.session_id] = session
+        return session
+
+    async def write_chunk(self, session_id: str, offset: int, chunks: AsyncIterator[bytes]) -> UploadSession:
+        """从offset处追加一个分块
+
+        请求体边接收边写入磁盘，内存占用与分块大小无关；连接中断时已写入的部分保留，
+        客户端查询偏移后从断点继续
+        """
+        session = self.get(session_id)
+        if session.lock.locked():
+            # 同一会话同时只允许一个写入请求
+            raise UploadOffsetMismatch(session.received)
+
+        async with session.lock:
+            if offset != session.received:
+                raise UploadOffsetMismatch(session.received)
+
+            # 断点续传后只有从头写入时才能继续增量计算哈希
+            if session.hasher is None and session.received == 0:
+                session.hasher = hashlib.sha256()
+
+            written = 0
+            try:
+                async with aiofiles.open(self._part_path(session_id), 'ab') as buffer:
+                    async for chunk in chunks:
+                        if not chunk:
+                            continue
+                        written += len(chunk)
+                        if written > self.max_chunk_size:
+                            raise UploadTooLarge(
+                                f"Chunk exceeds maximum size of {self.max_chunk_size // (1024 * 1024)}MB"
+                            )
+                        if session.received + len(chunk) > session.total_size:
+                            raise UploadTooLarge("Chunk exceeds declared file size")
+
+                        await buffer.write(chunk)
+                        session.received += len(chunk)
+                        if session.hasher is not None:
+                            session.hasher.update(chunk)
+            finally:
+                session.updated_at = time.time()
+
+        return session
+
+    async def complete(self, session_id: str) -> FileUploadResponse:
+        """所有字节接收完成后，将部分文件移入上传目录并登记到索引"""
+        session = self.get(session_id)
+
+        async with session.lock:
+            if session.received != session.total_size:
+                raise UploadOffsetMismatch(session.received)
+
+            part_path = self._part_path(session_id)
+            if session.hasher is not None:
+                file_hash = session.hasher.hexdigest()
+            else:
+                file_hash = await asyncio.to_thread(hash_file, str(part_path))
+
+            file_id, file_path = self.file_service.new_file_path(session.filename)
+            os.replace(part_path, file_path)
+            self._meta_path(session_id).unlink(missing_ok=True)
+            self._sessions.pop(session_id, None)
+
+        return self.file_service.register_file(
+            file_id, file_path, session.filename, session.total_size, file_hash, session.content_type
+        )
+
+    def abort(self, session_id: str):
+        """取消上传并删除部分文件"""
+        session = self.get(session_id)
+        self._sessions.pop(session.session_id, None)
+        self._remove_files(session.session_id)
+
+    @property
+    def bytes_received(self) -> int:
+        """未完成会话的部分文件占用的字节数"""
+        return sum(session.received for session in self._sessions.values())
+
+    def metrics(self) -> Dict:
+        """未完成会话统计"""
+        return {
+            "sessions": len(self._sessions),
+            "bytes_received": self.bytes_received,
+            "max_file_size": self.max_file_size
+        }
@@ -0,0 +1,140 @@
+import asyncio
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+from ..models.schemas import APIConfig
+from .config_service import ConfigService
+from .subtitle_service import AudioSubtitleService
+from .transcription_cache import TranscriptionCache
+from .translation_memory import TranslationMemory
+
+
+def config_fingerprint(config: APIConfig, prefix: str = "") -> str:
+    """计算配置指纹，prefix用于只计算某一类字段（如asr_、translation_）"""
+    data = {key: value for key, value in config.dict().items() if key.startswith(prefix)}
+    raw = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ServiceRegistry:
+    """按配置指纹管理字幕服务实例，配置变更时原子切换"""
+
+    def __init__(self, config_service: Optional[ConfigService] = None):
+        self.config_service = config_service or ConfigService()
+
+        self._current: Optional[AudioSubtitleService] = None
+        self._fingerprint: Optional[str] = None
+        # 已被替换但仍有任务在使用的旧实例
+        self._retired: List[AudioSubtitleService] = []
+        # 每个实例上正在执行的任务数
+        self._active: Dict[int, int] = {}
+
+        # 缓存与配置无关，所有实例共用
+        self._transcription_cache: Optional[TranscriptionCache] = None
+        self._translation_memory: Optional[TranslationMemory] = None
+
+    def get_service(self) -> Optional[AudioSubtitleService]:
+        """获取与当前配置对应的服务实例，配置未设置时返回None"""
+        config = self.config_service.get_config()
+        if not config:
+            return None
+
+        fingerprint = config_fingerprint(config)
+        if self._current is None or fingerprint != self._fingerprint:
+            self._swap(config, fingerprint)
+
+        return self._current
+
+    def acquire(self) -> Optional[AudioSubtitleService]:
+        """获取服务实例并登记为使用中，任务结束后需调用release"""
+        service = self.get_service()
+        if service is not None:
+            self._active[id(service)] = self._active.get(id(service), 0) + 1
+        return service
+
+    async def release(self, service: AudioSubtitleService):
+        """任务结束，旧实例不再使用时释放其独占的资源"""
+        count = self._active.get(id(service), 0) - 1
+        if count > 0:
+            self._active[id(service)] = count
+            return
+
+        self._active.pop(id(service), None)
+        if service in self._retired:
+            self._retired.remove(service)
+            await self._close_unshared(service)
+
+    def _swap(self, config: APIConfig, fingerprint: str):
+        """创建新实例并替换当前实例"""
+        if self._transcription_cache is None:
+            self._transcription_cache = TranscriptionCache()
+        if self._translation_memory is None:
+            self._translation_memory = TranslationMemory()
+
+        # 复制配置，避免就地修改配置影响正在运行的任务
+        service = AudioSubtitleService(
+            APIConfig(**config.dict()),
+            transcription_cache=self._transcription_cache,
+            translation_memory=self._translation_memory
+        )
+
+        previous = self._current
+        if previous is not None:
+            # 只有无关字段变化时复用已建立的连接池和翻译客户端
+            service.reuse_resources(
+                previous,
+                reuse_asr=config_fingerprint(previous.config, "asr_") == config_fingerprint(config, "asr_"),
+                reuse_translation=(
+                    config_fingerprint(previous.config, "translation_") ==
+                    config_fingerprint(config, "translation_")
+                )
+            )
+
+        self._current = service
+        self._fingerprint = fingerprint
+        print("Created new subtitle service for updated configuration")
+
+        if previous is not None:
+            if self._active.get(id(previous)):
+                self._retired.append(previous)
+            else:
+                self._schedule_close(previous)
+
+    def _schedule_close(self, service: AudioSubtitleService):
+        """在事件循环中释放旧实例的资源"""
+        try:
+            asyncio.get_running_loop().create_task(self._close_unshared(service))
+        except RuntimeError:
+            # 没有运行中的事件循环，连接池尚未在任何循环中创建，无需释放
+            pass
+
+    async def _close_unshared(self, service: AudioSubtitleService):
+        """关闭不再被任何存活实例共用的ASR连接"""
+        live = [s for s in [self._current, *self._retired] if s is not None and s is not service]
+        if not any(s.asr_client is service.asr_client for s in live):
+            await service.asr_poller.aclose()
+            await service.asr_client.aclose()
+
+    async def aclose(self):
+        """关闭所有实例和共用缓存"""
+        for service in [*self._retired, self._current]:
+            if service is not None:
+                await service.asr_poller.aclose()
+                await service.asr_client.aclose()
+
+        if self._transcription_cache is not None:
+            self._transcription_cache.close()
+        if self._translation_memory is not None:
+            self._translation_memory.close()
+
+        self._current = None
+        self._fingerprint = None
+        self._retired = []
+        self._active = {}
+        self._transcription_cache = None
+        self._translation_memory = None
+
+
+# 全局共享的配置服务和服务注册表
+service_registry = ServiceRegistry()
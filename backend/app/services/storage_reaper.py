@@ -0,0 +1,189 @@
+import asyncio
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .file_service import FileService
+from .resumable_upload import ResumableUploadService
+from .upload_index import UploadRecord
+
+
+@dataclass
+class ReaperStats:
+    """回收统计"""
+    runs: int = 0
+    files_deleted: int = 0
+    bytes_reclaimed: int = 0
+    expired_deleted: int = 0
+    evicted_deleted: int = 0
+    orphans_deleted: int = 0
+    skipped_in_use: int = 0
+    partial_sessions_purged: int = 0
+    last_run_at: Optional[float] = None
+    last_run_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+class StorageReaper:
+    """上传目录回收任务 - 定期按TTL和总容量上限（LRU）删除文件，跳过正在使用的文件
+
+    同时清理过期的断点续传会话，未完成会话已接收的字节计入容量上限
+    """
+
+    def __init__(
+        self,
+        file_service: FileService,
+        interval: Optional[float] = None,
+        ttl: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        resumable_uploads: Optional[ResumableUploadService] = None
+    ):
+        self.file_service = file_service
+        self.resumable_uploads = resumable_uploads
+        self.interval = interval or float(os.getenv("UPLOAD_REAP_INTERVAL", "300"))
+        # 文件在最后一次使用后保留的时间（秒）
+        self.ttl = ttl or float(os.getenv("UPLOAD_TTL", "3600"))
+        self.max_bytes = max_bytes or int(os.getenv("UPLOAD_MAX_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+        self.stats = ReaperStats()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """在事件循环中启动定期回收"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """停止定期回收"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                # 会话状态只在事件循环中修改，先在这里清理过期会话并统计部分文件大小
+                partial_bytes = self._purge_partial_uploads()
+                # 删除文件和扫描目录都在线程中执行，不阻塞事件循环
+                await asyncio.to_thread(self.reap_once, partial_bytes)
+            except Exception as e:
+                self.stats.last_error = str(e)
+                print(f"Storage reaper error: {e}")
+
+            await asyncio.sleep(self.interval)
+
+    def _purge_partial_uploads(self) -> int:
+        """删除超过TTL未更新的断点续传会话，返回剩余会话已接收的字节数"""
+        if self.resumable_uploads is None:
+            return 0
+
+        purged = self.resumable_uploads.purge_expired()
+        if purged:
+            self.stats.partial_sessions_purged += purged
+            print(f"Storage reaper removed {purged} expired resumable upload sessions")
+        return self.resumable_uploads.bytes_received
+
+    def reap_once(self, partial_bytes: int = 0) -> Dict:
+        """执行一次回收，返回本次统计；partial_bytes为未完成上传占用的字节，计入容量上限"""
+        started = time.monotonic()
+        now = time.time()
+        pinned = self.file_service.pinned_files()
+        result = {"expired": 0, "evicted": 0, "orphans": 0, "bytes": 0, "skipped_in_use": 0}
+
+        records = sorted(self.file_service.index.records(), key=lambda record: record.accessed_at)
+        remaining: List[UploadRecord] = []
+
+        # 超过TTL的文件
+        for record in records:
+            if now - record.accessed_at <= self.ttl:
+                remaining.append(record)
+            elif self._delete(record, pinned, result):
+                result["expired"] += 1
+            else:
+                remaining.append(record)
+
+        # 超过容量上限时按最近使用时间从旧到新淘汰，共享的存储文件只计算一次
+        total = self.file_service.index.total_bytes + partial_bytes
+        for record in remaining:
+            if total <= self.max_bytes:
+                break
+            bytes_before = result["bytes"]
+            if self._delete(record, pinned, result):
+                result["evicted"] += 1
+                total -= result["bytes"] - bytes_before
+
+        result["orphans"] = self._delete_orphans(now, result)
+
+        self.stats.runs += 1
+        self.stats.expired_deleted += result["expired"]
+        self.stats.evicted_deleted += result["evicted"]
+        self.stats.orphans_deleted += result["orphans"]
+        self.stats.files_deleted += result["expired"] + result["evicted"] + result["orphans"]
+        self.stats.bytes_reclaimed += result["bytes"]
+        self.stats.skipped_in_use += result["skipped_in_use"]
+        self.stats.last_run_at = now
+        self.stats.last_run_seconds = time.monotonic() - started
+        self.stats.last_error = None
+
+        if result["expired"] or result["evicted"] or result["orphans"]:
+            print(
+                f"Storage reaper removed {result['expired']} expired, {result['evicted']} evicted and "
+                f"{result['orphans']} orphaned files ({result['bytes']} bytes)"
+            )
+        return result
+
+    def _delete(self, record: UploadRecord, pinned: set, result: Dict) -> bool:
+        if record.file_id in pinned:
+            result["skipped_in_use"] += 1
+            return False
+
+        if self.file_service.delete_if_unused(record.file_id) is None:
+            result["skipped_in_use"] += 1
+            return False
+
+        # 其他记录仍引用同一存储文件时只删除记录
+        if not self.file_service.index.is_referenced(record.path):
+            result["bytes"] += record.file_size
+        return True
+
+    def _delete_orphans(self, now: float, result: Dict) -> int:
+        """删除目录中未登记且超过TTL的文件（如旧版本遗留的 *_extracted.wav）"""
+        deleted = 0
+        referenced = self.file_service.index.referenced_paths()
+        for path in Path(self.file_service.upload_dir).iterdir():
+            if not path.is_file() or path.name.startswith('.'):
+                continue
+            if str(path) in referenced:
+                continue
+
+            try:
+                stat = path.stat()
+                if now - stat.st_mtime <= self.ttl:
+                    continue
+                path.unlink()
+            except FileNotFoundError:
+                continue
+
+            result["bytes"] += stat.st_size
+            deleted += 1
+        return deleted
+
+    def metrics(self) -> Dict:
+        """回收统计和当前占用"""
+        return {
+            **asdict(self.stats),
+            "interval": self.interval,
+            "ttl": self.ttl,
+            "max_bytes": self.max_bytes,
+            "current_files": len(self.file_service.index),
+            "current_blobs": self.file_service.index.blob_count,
+            "current_bytes": self.file_service.index.total_bytes,
+            "files_in_use": len(self.file_service.pinned_files()),
+            "partial_bytes": self.resumable_uploads.bytes_received if self.resumable_uploads else 0
+        }
@@ -1,15 +1,15 @@
 import os
 import json
 import tempfile
+import shutil
+import asyncio
+import threading
 import time
-import subprocess
-from typing import List, Dict, Optional, Tuple
+from typing import Any, AsyncIterator, Callable, List, Dict, Optional, Tuple, Union
 from datetime import datetime
-import requests
 import soundfile as sf
 from pathlib import Path
 import urllib.parse
-import re
 
 from ..models.schemas import (
     SubtitleSegment, 
@@ -18,15 +18,135 @@ from ..models.schemas import (
     APIConfig,
     LanguageCode
 )
+from ..models.segment_store import SegmentStore
+from .asr_client import ByteDanceASRClient, ASRPoller
+from .audio_chunker import AudioChunker, AudioChunk
+from .ffmpeg_runner import AudioStream, FFmpegRunner
+from .media_probe import MediaProbe, MediaStrategy, choose_strategy
+from .transcription_cache import TranscriptionCache
+from .translation_memory import TranslationMemory, TranslationMemoryStats
+from ..utils.helpers import hash_file, estimate_tokens
+from ..utils.srt import (
+    format_timestamp,
+    parse_srt,
+    parse_timestamp,
+    render_srt,
+    segment_entries,
+    validate_srt
+)
+from concurrent.futures import ThreadPoolExecutor
+
+
+# 翻译提示词版本，修改提示词或输出格式时递增，使旧的翻译记忆失效
+TRANSLATION_PROMPT_VERSION = "2"
+
+# ffmpeg解码PCM计算切分点时使用的采样率
+PCM_SAMPLE_RATE = 16000
+
+LANGUAGE_NAMES = {
+    "en": "英语",
+    "zh": "中文", 
+    "es": "西班牙语",
+    "fr": "法语",
+    "de": "德语",
+    "ja": "日语",
+    "ko": "韩语",
+    "ru": "俄语",
+    "pt": "葡萄牙语",
+    "it": "意大利语",
+    "ar": "阿拉伯语",
+    "hi": "印地语",
+    "th": "泰语",
+    "vi": "越南语",
+    "tr": "土耳其语"
+}
+
+# 进度回调：progress(stage, message, **details)
+ProgressCallback = Callable[..., None]
+
+
+def report_progress(progress: Optional[ProgressCallback], stage: str, message: Optional[str] = None, **details: Any):
+    """上报处理进度，回调出错不影响流水线"""
+    if progress is None:
+        return
+    try:
+        progress(stage, message, **details)
+    except Exception as e:
+        print(f"Progress callback error: {e}")
 
 
 class AudioSubtitleService:
     """音频字幕翻译服务"""
     
-    def __init__(self, config: APIConfig):
+    def __init__(
+        self,
+        config: APIConfig,
+        transcription_cache: Optional[TranscriptionCache] = None,
+        translation_memory: Optional[TranslationMemory] = None
+    ):
         self.config = config
-        self.translation_client = None
-        self._initialize_translation_client()
+        self.asr_client = ByteDanceASRClient(config)
+        self.asr_poller = ASRPoller(self.asr_client)
+        self.audio_chunker = AudioChunker()
+        self.ffmpeg = FFmpegRunner()
+        self.media_probe = MediaProbe()
+        # 视频音轨提取格式：mp3/ogg经管道压缩上传，wav提取到临时文件（支持长音频分片）
+        self.video_audio_format = os.getenv("VIDEO_AUDIO_FORMAT", "mp3")
+        # 长音频分片并行转录时，同时上传的分片数量
+        self.max_parallel_chunks = int(os.getenv("ASR_MAX_PARALLEL_CHUNKS", "4"))
+        self.transcription_cache = transcription_cache or TranscriptionCache()
+        # 正在进行的转录（按缓存键），相同内容的并发任务等待同一次转录
+        self._inflight_transcriptions: Dict[str, asyncio.Future] = {}
+        self.translation_memory = translation_memory or TranslationMemory()
+        # 每批最多片段数量和同时进行的批次数量
+        self.translation_batch_size = int(os.getenv("TRANSLATION_BATCH_SIZE", "50"))
+        self.translation_concurrency = int(os.getenv("TRANSLATION_CONCURRENCY", "4"))
+        # 每批提示词的token预算，输出预算由translation_max_tokens决定
+        self.translation_max_input_tokens = int(os.getenv("TRANSLATION_MAX_INPUT_TOKENS", "3000"))
+        # 批量翻译结果缺失或格式错误时，重新请求缺失编号的次数
+        self.translation_repair_attempts = int(os.getenv("TRANSLATION_REPAIR_ATTEMPTS", "2"))
+        
+        # 翻译客户端延迟构建，连通性检测单独在后台进行
+        self._translation_client = None
+        self._translation_client_initialized = False
+        self._translation_client_lock = threading.Lock()
+        self.translation_probe_ttl = float(os.getenv("TRANSLATION_PROBE_TTL", "600"))
+        self._translation_probe_task: Optional[asyncio.Task] = None
+        self._translation_probe_result: Optional[Dict] = None
+        self._translation_probe_time = 0.0
+    
+    def reuse_resources(self, previous: "AudioSubtitleService", reuse_asr: bool, reuse_translation: bool):
+        """复用旧实例中仍然适用的ASR连接池和翻译客户端"""
+        # FFmpeg并发上限和媒体探测缓存与配置无关，始终沿用
+        self.ffmpeg = previous.ffmpeg
+        self.media_probe = previous.media_probe
+        self._inflight_transcriptions = previous._inflight_transcriptions
+        
+        if reuse_asr:
+            self.asr_client = previous.asr_client
+            self.asr_poller = previous.asr_poller
+        
+        if reuse_translation:
+            with previous._translation_client_lock:
+                self._translation_client = previous._translation_client
+                self._translation_client_initialized = previous._translation_client_initialized
+            self._translation_probe_result = previous._translation_probe_result
+            self._translation_probe_time = previous._translation_probe_time
+    
+    @property
+    def translation_client(self):
+        """翻译客户端，首次访问时构建（不产生网络请求）"""
+        if not self._translation_client_initialized:
+            with self._translation_client_lock:
+                if not self._translation_client_initialized:
+                    self._translation_client = self._initialize_translation_client()
+                    self._translation_client_initialized = True
+        return self._translation_client
+    
+    @property
+    def llm(self):
+        """使用LangChain进行翻译的客户端"""
+        return self.translation_client
     
     def _initialize_translation_client(self):
         """初始化翻译客户端"""
@@ -36,9 +156,7 @@ class AudioSubtitleService:
             # 检查API密钥是否有效
             if not self.config.translation_api_key or self.config.translation_api_key in ["test", ""]:
                 print("Translation API key is not configured or is invalid")
-                self.translation_client = None
-                self.llm = None
-                return
+                return None
             
             print(f"Initializing translation client with:")
             print(f"  Provider: {self.config.translation_provider}")
@@ -54,312 +172,308 @@ class AudioSubtitleService:
                 else:
                     base_url += '/v1'
             
-            # 初始化OpenAI客户端（用于测试）
-            try:
-                # 临时移除代理环境变量，避免兼容性问题
-                old_http_proxy = os.environ.pop('HTTP_PROXY', None)
-                old_https_proxy = os.environ.pop('HTTPS_PROXY', None)
-                
-                try:
-                    # 使用LangChain ChatOpenAI初始化客户端
-                    self.translation_client = ChatOpenAI(
-                        model=self.config.translation_model,
-                        api_key=self.config.translation_api_key,
-                        base_url=base_url,
-                        timeout=25,  # 25秒超时，比前端30秒超时稍短
-                        temperature=0.1,  # 降低温度以提高响应速度
-                        request_timeout=25
-                    )
-                    print("LangChain ChatOpenAI client initialized successfully")
-                finally:
-                    # 恢复代理环境变量
-                    if old_http_proxy:
-                        os.environ['HTTP_PROXY'] = old_http_proxy
-                    if old_https_proxy:
-                        os.environ['HTTPS_PROXY'] = old_https_proxy
-                        
-            except Exception as e:
-                print(f"Failed to initialize OpenAI client: {e}")
-                self.translation_client = None
-                return
+            # 临时移除代理环境变量，避免兼容性问题
+            old_http_proxy = os.environ.pop('HTTP_PROXY', None)
+            old_https_proxy = os.environ.pop('HTTPS_PROXY', None)
             
-            # 测试连接
             try:
-                test_response = self.translation_client.invoke("Hello")
-                print("Translation client initialized and tested successfully")
-            except Exception as test_error:
-                print(f"Translation client test failed: {test_error}")
-                self.translation_client = None
-                self.llm = None
-                return
-            
-            # 使用LangChain进行翻译
-            self.llm = self.translation_client
-            print("Using LangChain ChatOpenAI for translation")
+                # 使用LangChain ChatOpenAI初始化客户端
+                client = ChatOpenAI(
+                    model=self.config.translation_model,
+                    api_key=self.config.translation_api_key,
+                    base_url=base_url,
+                    timeout=25,  # 25秒超时，比前端30秒超时稍短
+                    temperature=0.1,  # 降低温度以提高响应速度
+                    max_tokens=self.config.translation_max_tokens,
+                    request_timeout=25
+                )
+                print("LangChain ChatOpenAI client initialized successfully")
+                return client
+            finally:
+                # 恢复代理环境变量
+                if old_http_proxy:
+                    os.environ['HTTP_PROXY'] = old_http_proxy
+                if old_https_proxy:
+                    os.environ['HTTPS_PROXY'] = old_https_proxy
                 
         except Exception as e:
             print(f"Failed to initialize translation client: {e}")
-            self.translation_client = None
-            self.llm = None
+            return None
     
     def is_video_file(self, file_path: str) -> bool:
         """检查是否为视频文件"""
         video_extensions = ['.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm']
         return any(file_path.lower().endswith(ext) for ext in video_extensions)
     
-    def extract_audio_from_video(self, video_path: str) -> str:
-        """从视频文件中提取音频"""
+    async def probe_translation_client(self, force: bool = False) -> Dict:
+        """后台检测翻译服务连通性，结果缓存一段时间，并发调用共用同一次检测"""
+        now = time.monotonic()
+        if (
+            not force and
+            self._translation_probe_result is not None and
+            now - self._translation_probe_time < self.translation_probe_ttl
+        ):
+            return self._translation_probe_result
+        
+        if self._translation_probe_task is None or self._translation_probe_task.done():
+            self._translation_probe_task = asyncio.create_task(self._run_translation_probe())
+        
+        return await asyncio.shield(self._translation_probe_task)
+    
+    async def _run_translation_probe(self) -> Dict:
+        """执行一次连通性检测"""
+        client = self.translation_client
+        if not client:
+            result = {"available": False, "message": "Translation client not configured"}
+        else:
+            try:
+                await client.ainvoke("Hello")
+                result = {"available": True, "message": "Translation service reachable"}
+            except Exception as e:
+                result = {"available": False, "message": f"Translation client test failed: {str(e)}"}
+        
+        result["checked_at"] = datetime.now().isoformat()
+        self._translation_probe_result = result
+        self._translation_probe_time = time.monotonic()
+        return result
+    
+    def get_audio_duration(self, audio_file_path: str) -> Optional[float]:
+        """获取音频时长（秒），无法识别格式时返回None"""
         try:
-            # 创建临时音频文件
-            audio_path = video_path.rsplit('.', 1)[0] + '_extracted.wav'
-            
-            # 使用ffmpeg提取音频
-            cmd = [
-                'ffmpeg', '-i', video_path, '-vn', '-acodec', 'pcm_s16le',
-                '-ar', '16000', '-ac', '1', audio_path, '-y'
-            ]
-            
-            process = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            if os.path.exists(audio_path):
-                return audio_path
-            else:
-                raise Exception("Failed to extract audio from video")
-                
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"FFmpeg error: {e.stderr}")
-        except FileNotFoundError:
-            raise Exception("FFmpeg not found. Please install FFmpeg to process video files.")
-        except Exception as e:
-            raise Exception(f"Audio extraction failed: {str(e)}")
+            return sf.info(audio_file_path).duration
+        except Exception:
+            return None
     
-    def transcribe_audio_from_url(self, audio_url: str, source_language: LanguageCode = LanguageCode.AUTO) -> List[SubtitleSegment]:
+    async def transcribe_audio_from_url(
+        self,
+        audio_url: str,
+        source_language: LanguageCode = LanguageCode.AUTO,
+        progress: Optional[ProgressCallback] = None
+    ) -> SegmentStore:
         """使用字节跳动API进行在线音频URL转录"""
         try:
             print(f"Transcribing audio from URL with language: {source_language}")
             
-            # 设置语言参数
-            language_map = {
-                LanguageCode.ZH: "zh-CN",
-                LanguageCode.EN: "en-US",
-                LanguageCode.AUTO: "zh-CN"
-            }
-            language = language_map.get(source_language, "zh-CN")
-            
             # 提交音频URL进行识别
-            response = requests.post(
-                f'{self.config.asr_base_url}/submit',
-                params=dict(
-                    appid=self.config.asr_appid,
-                    language=language,
-                    use_itn='True',
-                    use_capitalize='True',
-                    max_lines=1,
-                    words_per_line=15,
-                ),
-                json={
-                    "url": audio_url
-                },
-                headers={
-                    'Content-Type': 'application/json',
-                    'Authorization': f'Bearer; {self.config.asr_access_token}'
-                }
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"ByteDance API submit failed: {response.text}")
-            
-            result = response.json()
-            if result.get('code') != 0:
-                raise Exception(f"ByteDance API error: {result.get('message', 'Unknown error')}")
-            
-            job_id = result.get('id')
-            if not job_id:
-                raise Exception("ByteDance API did not return job ID")
-            
-            # 轮询查询结果
-            print(f"Job ID: {job_id}, waiting for completion...")
-            
-            max_wait_time = 120  # 最大等待时间（秒）
-            poll_interval = 2   # 轮询间隔（秒）
-            elapsed_time = 0
-            
-            while elapsed_time < max_wait_time:
-                response = requests.get(
-                    f'{self.config.asr_base_url}/query',
-                    params=dict(
-                        appid=self.config.asr_appid,
-                        id=job_id,
-                    ),
-                    headers={
-                        'Authorization': f'Bearer; {self.config.asr_access_token}'
-                    }
-                )
-                
-                if response.status_code != 200:
-                    raise Exception(f"ByteDance API query failed: {response.text}")
-                
-                result = response.json()
-                
-                if result.get('code') == 0 and result.get('utterances'):
-                    # 识别完成
-                    utterances = result.get('utterances', [])
-                    segments = []
-                    
-                    for utterance in utterances:
-                        if utterance.get('attribute', {}).get('event') == 'speech':
-                            segments.append(SubtitleSegment(
-                                text=utterance.get('text', ''),
-                                start=utterance.get('start_time', 0) / 1000.0,
-                                end=utterance.get('end_time', 0) / 1000.0,
-                                confidence=0.95
-                            ))
-                    
-                    print(f"Transcription completed with {len(segments)} segments")
-                    return segments
-                
-                # 如果还在处理中，继续等待
-                time.sleep(poll_interval)
-                elapsed_time += poll_interval
-            
-            # 超时
-            raise Exception(f"ByteDance API timeout after {max_wait_time} seconds")
+            report_progress(progress, "submitting_asr", "Submitting audio URL for transcription")
+            job_id = await self.asr_client.submit_url(audio_url, source_language)
+            return await self._wait_for_transcription(job_id, progress=progress)
             
         except Exception as e:
             print(f"URL transcription error: {e}")
             raise Exception(f"Audio URL transcription failed: {str(e)}")
 
-    def transcribe_audio(self, audio_file_path: str, source_language: LanguageCode = LanguageCode.AUTO) -> List[SubtitleSegment]:
+    async def transcribe_audio(
+        self,
+        audio_file_path: str,
+        source_language: LanguageCode = LanguageCode.AUTO,
+        progress: Optional[ProgressCallback] = None,
+        audio_duration: Optional[float] = None,
+        content_type: Optional[str] = None
+    ) -> SegmentStore:
         """使用字节跳动API进行音频转录"""
         try:
             print(f"Transcribing audio with language: {source_language}")
             
-            # 设置语言参数
-            language_map = {
-                LanguageCode.ZH: "zh-CN",
-                LanguageCode.EN: "en-US",
-                LanguageCode.AUTO: "zh-CN"
-            }
-            language = language_map.get(source_language, "zh-CN")
+            # 获取音频时长，用于计算轮询间隔和超时时间；soundfile读取到的时长同时说明该格式可以切分
+            readable_duration = None
+            if audio_duration is None:
+                readable_duration = audio_duration = await asyncio.to_thread(self.get_audio_duration, audio_file_path)
+            
+            # 长音频切分后并行转录（需要soundfile能够读取该格式）
+            if self.audio_chunker.should_split(audio_duration):
+                if readable_duration is None:
+                    readable_duration = await asyncio.to_thread(self.get_audio_duration, audio_file_path)
+                if readable_duration:
+                    return await self._transcribe_chunked(audio_file_path, source_language, progress)
             
             # 提交音频文件进行识别
-            with open(audio_file_path, 'rb') as audio_file:
-                audio_data = audio_file.read()
-                
-                # 检测音频格式并设置正确的Content-Type
-                if audio_file_path.lower().endswith('.mp3'):
-                    content_type = 'audio/mpeg'
-                elif audio_file_path.lower().endswith('.wav'):
-                    content_type = 'audio/wav'
-                elif audio_file_path.lower().endswith('.m4a'):
-                    content_type = 'audio/mp4'
-                else:
-                    content_type = 'audio/mpeg'
-                
-                response = requests.post(
-                    f'{self.config.asr_base_url}/submit',
-                    params=dict(
-                        appid=self.config.asr_appid,
-                        language=language,
-                        use_itn='True',
-                        use_capitalize='True',
-                        max_lines=1,
-                        words_per_line=15,
-                    ),
-                    data=audio_data,
-                    headers={
-                        'Content-Type': content_type,
-                        'Authorization': f'Bearer; {self.config.asr_access_token}'
-                    }
-                )
-                
-                if response.status_code != 200:
-                    raise Exception(f"ByteDance API submit failed: {response.text}")
-                
-                result = response.json()
-                if result.get('code') != 0:
-                    raise Exception(f"ByteDance API error: {result.get('message', 'Unknown error')}")
-                
-                job_id = result.get('id')
-                if not job_id:
-                    raise Exception("ByteDance API did not return job ID")
-                
-                # 轮询查询结果
-                print(f"Job ID: {job_id}, waiting for completion...")
-                
-                max_wait_time = 120  # 最大等待时间（秒）
-                poll_interval = 2   # 轮询间隔（秒）
-                elapsed_time = 0
-                
-                while elapsed_time < max_wait_time:
-                    response = requests.get(
-                        f'{self.config.asr_base_url}/query',
-                        params=dict(
-                            appid=self.config.asr_appid,
-                            id=job_id,
-                        ),
-                        headers={
-                            'Authorization': f'Bearer; {self.config.asr_access_token}'
-                        }
-                    )
-                    
-                    if response.status_code != 200:
-                        raise Exception(f"ByteDance API query failed: {response.text}")
-                    
-                    result = response.json()
-                    
-                    if result.get('code') == 0 and result.get('utterances'):
-                        # 识别完成
-                        utterances = result.get('utterances', [])
-                        segments = []
-                        
-                        for utterance in utterances:
-                            if utterance.get('attribute', {}).get('event') == 'speech':
-                                segments.append(SubtitleSegment(
-                                    text=utterance.get('text', ''),
-                                    start=utterance.get('start_time', 0) / 1000.0,
-                                    end=utterance.get('end_time', 0) / 1000.0,
-                                    confidence=0.95
-                                ))
-                        
-                        print(f"Transcription completed with {len(segments)} segments")
-                        return segments
-                    
-                    # 如果还在处理中，继续等待
-                    time.sleep(poll_interval)
-                    elapsed_time += poll_interval
-                
-                # 超时
-                raise Exception(f"ByteDance API timeout after {max_wait_time} seconds")
-                
+            report_progress(progress, "submitting_asr", "Uploading audio for transcription", audio_duration=audio_duration)
+            job_id = await self.asr_client.submit_file(audio_file_path, source_language, content_type)
+            return await self._wait_for_transcription(job_id, audio_duration, progress)
+            
+        except Exception as e:
+            print(f"Transcription error: {e}")
+            raise Exception(f"Audio transcription failed: {str(e)}")
+    
+    async def transcribe_video(
+        self,
+        video_path: str,
+        source_language: LanguageCode = LanguageCode.AUTO,
+        progress: Optional[ProgressCallback] = None,
+        audio_duration: Optional[float] = None
+    ) -> SegmentStore:
+        """将视频音轨压缩编码后经管道直接上传识别，不生成中间文件"""
+        print(f"Streaming {self.video_audio_format} audio from video with language: {source_language}")
+        stream = self.ffmpeg.audio_stream(video_path, self.video_audio_format)
+        return await self.transcribe_stream(stream, source_language, progress, audio_duration)
+    
+    async def transcribe_stream(
+        self,
+        stream: AudioStream,
+        source_language: LanguageCode = LanguageCode.AUTO,
+        progress: Optional[ProgressCallback] = None,
+        audio_duration: Optional[float] = None
+    ) -> SegmentStore:
+        """上传ffmpeg输出的音频流进行识别"""
+        try:
+            report_progress(progress, "submitting_asr", "Streaming audio for transcription", audio_duration=audio_duration)
+            
+            try:
+                job_id = await self.asr_client.submit_stream(stream, stream.content_type, source_language)
+            finally:
+                await stream.aclose()
+            
+            print(f"Uploaded {stream.size} bytes of {stream.content_type} audio")
+            return await self._wait_for_transcription(job_id, audio_duration or stream.duration, progress)
+            
         except Exception as e:
             print(f"Transcription error: {e}")
             raise Exception(f"Audio transcription failed: {str(e)}")
     
-    def translate_text(self, text: str, target_language: str) -> str:
-        """翻译文本"""
+    async def transcribe_media(
+        self,
+        media_path: str,
+        source_language: LanguageCode = LanguageCode.AUTO,
+        progress: Optional[ProgressCallback] = None
+    ) -> SegmentStore:
+        """探测媒体格式后选择开销最低的方式转录：直接上传、复制音轨或转码"""
+        report_progress(progress, "probing", "Inspecting media format")
+        info = await self.media_probe.probe(media_path)
+        strategy = choose_strategy(info, self.is_video_file(media_path))
+        duration = info.duration if info else None
+        print(f"Media strategy for {Path(media_path).name}: {strategy.value}")
+        
+        # 长媒体按探测到的时长切分后并行转录，只有短媒体走直接上传、复制音轨或转码管道；
+        # soundfile能读取的音频直接计算切点，视频及其他格式由ffmpeg解码后计算
+        if self.audio_chunker.should_split(duration):
+            readable = False
+            if not self.is_video_file(media_path):
+                readable = bool(await asyncio.to_thread(self.get_audio_duration, media_path))
+            return await self._transcribe_chunked(
+                media_path, source_language, progress, decode_with_ffmpeg=not readable
+            )
+        
+        if strategy == MediaStrategy.PASSTHROUGH:
+            content_type = info.passthrough_content_type if info else None
+            return await self.transcribe_audio(media_path, source_language, progress, duration, content_type)
+        
+        if strategy == MediaStrategy.COPY:
+            report_progress(progress, "extracting_audio", f"Copying {info.audio_codec} audio track")
+            if info.audio_codec == "mp3":
+                return await self.transcribe_stream(self.ffmpeg.copy_stream(media_path), source_language, progress, duration)
+            # AAC需要可寻址的m4a容器，复制到临时文件
+            async with self.ffmpeg.extracted_audio(media_path, stream_copy=True) as extracted_path:
+                return await self.transcribe_audio(extracted_path, source_language, progress, duration, "audio/mp4")
+        
+        if self.video_audio_format != "wav":
+            return await self.transcribe_video(media_path, source_language, progress, duration)
+        
+        # 提取的音频在转录结束后删除
+        report_progress(progress, "extracting_audio", "Extracting audio")
+        async with self.ffmpeg.extracted_audio(media_path) as extracted_path:
+            return await self.transcribe_audio(extracted_path, source_language, progress, duration)
+    
+    async def _transcribe_chunked(
+        self,
+        audio_file_path: str,
+        source_language: LanguageCode,
+        progress: Optional[ProgressCallback] = None,
+        decode_with_ffmpeg: bool = False
+    ) -> SegmentStore:
+        """在静音处切分长音频，并行提交各分片并按时间偏移拼接结果
+
+        分片由ffmpeg直接从源文件截取并压缩为16kHz单声道，上传体积不随源文件采样率和声道数膨胀；
+        decode_with_ffmpeg为True时（视频等soundfile无法读取的格式）由ffmpeg解码为PCM流计算切点
+        """
+        chunk_dir = tempfile.mkdtemp(prefix="asr_chunks_", dir=self.ffmpeg.temp_dir)
+        semaphore = asyncio.Semaphore(self.max_parallel_chunks)
+        chunks_done = 0
+        stem = Path(audio_file_path).stem
+        
+        async def transcribe_chunk(chunk: AudioChunk) -> SegmentStore:
+            nonlocal chunks_done
+            async with semaphore:
+                chunk.path = str(Path(chunk_dir) / f"{stem}_chunk{chunk.index:04d}.mp3")
+                content_type = await self.ffmpeg.cut_audio(audio_file_path, chunk.start, chunk.duration, chunk.path)
+                job_id = await self.asr_client.submit_file(chunk.path, source_language, content_type)
+            
+            segments = await self._wait_for_transcription(job_id, chunk.duration)
+            segments.shift(chunk.start)
+            
+            chunks_done += 1
+            report_progress(progress, "transcribing", None, chunks_done=chunks_done, chunks_total=len(chunks))
+            return segments
+        
+        tasks: List[asyncio.Task] = []
+        try:
+            report_progress(progress, "splitting_audio", "Splitting long audio at silences")
+            if decode_with_ffmpeg:
+                energies, duration = await self.audio_chunker.stream_energies(
+                    self.ffmpeg.pcm_stream(audio_file_path, PCM_SAMPLE_RATE), PCM_SAMPLE_RATE
+                )
+                chunks = self.audio_chunker.plan_from_energies(duration, energies)
+            else:
+                chunks = await asyncio.to_thread(self.audio_chunker.plan_chunks, audio_file_path)
+            print(f"Split audio into {len(chunks)} chunks for parallel transcription")
+            report_progress(
+                progress, "transcribing", f"Transcribing {len(chunks)} chunks in parallel",
+                chunks_done=0, chunks_total=len(chunks)
+            )
+            
+            tasks = [asyncio.create_task(transcribe_chunk(chunk)) for chunk in chunks]
+            results = await asyncio.gather(*tasks)
+        finally:
+            # 任一分片失败或整体被取消时，先取消其余分片并等待其退出，再删除分片文件
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            shutil.rmtree(chunk_dir, ignore_errors=True)
+        
+        return SegmentStore.concat(results)
+    
+    async def _wait_for_transcription(
+        self,
+        job_id: str,
+        audio_duration: Optional[float] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> SegmentStore:
+        """等待集中轮询器返回ASR结果并转换为字幕片段"""
+        print(f"Job ID: {job_id}, waiting for completion...")
+        
+        def on_poll(attempt: int):
+            report_progress(progress, "transcribing", None, asr_job_id=job_id, poll_attempt=attempt)
+        
+        report_progress(progress, "transcribing", "Waiting for transcription result", asr_job_id=job_id, poll_attempt=0)
+        utterances = await self.asr_poller.wait(job_id, audio_duration, on_poll if progress else None)
+        segments = self.asr_client.parse_segments(utterances)
+        
+        print(f"Transcription completed with {len(segments)} segments")
+        return segments
+    
+    def translate_text(
+        self,
+        text: str,
+        target_language: str,
+        stats: Optional[TranslationMemoryStats] = None
+    ) -> str:
+        """翻译文本，优先使用翻译记忆"""
         if not self.translation_client:
             raise ValueError("Translation client not initialized. Please check your translation API configuration.")
         
-        language_names = {
-            "en": "英语",
-            "zh": "中文", 
-            "es": "西班牙语",
-            "fr": "法语",
-            "de": "德语",
-            "ja": "日语",
-            "ko": "韩语",
-            "ru": "俄语",
-            "pt": "葡萄牙语",
-            "it": "意大利语",
-            "ar": "阿拉伯语",
-            "hi": "印地语",
-            "th": "泰语",
-            "vi": "越南语",
-            "tr": "土耳其语"
-        }
-        
-        target_lang_name = language_names.get(target_language, target_language)
+        cached = self.translation_memory.lookup(
+            [text], target_language, self.config.translation_model, TRANSLATION_PROMPT_VERSION
+        )[0]
+        if stats:
+            stats.record(hits=int(cached is not None), misses=int(cached is None))
+        if cached is not None:
+            return cached
+        
+        return self._translate_single(text, target_language)
+    
+    def _translate_single(self, text: str, target_language: str) -> str:
+        """调用LLM翻译单条文本并写入翻译记忆"""
+        target_lang_name = LANGUAGE_NAMES.get(target_language, target_language)
         
         prompt = f"将以下文本翻译为{target_lang_name}，只返回翻译结果：{text}"
         
@@ -374,109 +488,295 @@ class AudioSubtitleService:
             # 检查翻译结果是否有效
             if not translated_text or translated_text == text:
                 raise ValueError("Translation failed or returned empty result")
-            
-            return translated_text
         except Exception as e:
             raise RuntimeError(f"Translation API call failed: {str(e)}")
+        
+        self.translation_memory.store(
+            [(text, translated_text)], target_language, self.config.translation_model, TRANSLATION_PROMPT_VERSION
+        )
+        return translated_text
     
-    def translate_text_batch(self, texts: List[str], target_language: str) -> List[str]:
-        """批量翻译文本，提高效率"""
+    def translate_text_batch(
+        self,
+        texts: List[str],
+        target_language: str,
+        stats: Optional[TranslationMemoryStats] = None,
+        max_workers: int = 1
+    ) -> List[Optional[str]]:
+        """批量翻译文本，提高效率；翻译记忆命中的文本不再调用LLM，其余按token预算分批，可多线程并发
+
+        未能翻译的片段对应位置为None
+        """
         if not self.translation_client:
             raise ValueError("Translation client not initialized. Please check your translation API configuration.")
         
-        language_names = {
-            "en": "英语",
-            "zh": "中文", 
-            "es": "西班牙语",
-            "fr": "法语",
-            "de": "德语",
-            "ja": "日语",
-            "ko": "韩语",
-            "ru": "俄语",
-            "pt": "葡萄牙语",
-            "it": "意大利语",
-            "ar": "阿拉伯语",
-            "hi": "印地语",
-            "th": "泰语",
-            "vi": "越南语",
-            "tr": "土耳其语"
-        }
-        
-        target_lang_name = language_names.get(target_language, target_language)
-        
-        # 将多个文本合并为一个请求，减少API调用次数
-        combined_text = "\n".join([f"{i+1}. {text}" for i, text in enumerate(texts)])
-        
-        prompt = f"将以下编号的文本批量翻译为{target_lang_name}，保持编号格式，只返回翻译结果：\n{combined_text}"
+        results = self.translation_memory.lookup(
+            texts, target_language, self.config.translation_model, TRANSLATION_PROMPT_VERSION
+        )
+        missing = [i for i, result in enumerate(results) if result is None]
+        if stats:
+            stats.record(hits=len(texts) - len(missing), misses=len(missing))
         
-        try:
-            # 使用LangChain ChatOpenAI进行批量翻译
-            if self.llm:
-                response = self.llm.invoke(prompt)
-                translated_content = response.content.strip()
-                
-                # 解析翻译结果，提取编号的翻译
-                translated_texts = []
-                lines = translated_content.split('\n')
-                
-                for line in lines:
-                    line = line.strip()
-                    # 匹配编号格式 "1. 翻译结果" 或 "1翻译结果"
-                    match = re.match(r'^\d+[\.\:]\s*(.+)', line)
-                    if match:
-                        translated_texts.append(match.group(1))
-                    elif line and not translated_texts:
-                        # 如果没有编号但还有内容，可能是第一个翻译
-                        translated_texts.append(line)
-                
-                # 如果解析失败，返回原文
-                if len(translated_texts) != len(texts):
-                    print(f"Batch translation parsing failed, expected {len(texts)} got {len(translated_texts)}")
-                    return texts
-                
-                return translated_texts
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            batches = [missing_texts[start:end] for start, end in self.split_translation_batches(missing_texts)]
+            
+            if max_workers > 1 and len(batches) > 1:
+                with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    batch_results = list(pool.map(
+                        lambda batch: self._translate_batch_uncached(batch, target_language), batches
+                    ))
             else:
-                raise ValueError("Translation client not available")
+                batch_results = [self._translate_batch_uncached(batch, target_language) for batch in batches]
             
-        except Exception as e:
-            print(f"Batch translation failed: {e}")
-            # 如果批量翻译失败，回退到单个翻译
-            return [self.translate_text(text, target_language) for text in texts]
+            translated_texts = [text for batch_result in batch_results for text in batch_result]
+            for i, translated_text in zip(missing, translated_texts):
+                results[i] = translated_text
+        
+        return results
     
-    def generate_srt(self, segments: List[SubtitleSegment], is_translation: bool = False) -> str:
-        """生成SRT格式字幕"""
-        srt_content = ""
+    def split_translation_batches(self, texts: List[str]) -> List[Tuple[int, int]]:
+        """按估算的token预算将文本切分为连续批次，返回(start, end)列表"""
+        # 预留提示词说明和JSON键的开销，输出按译文比原文长50%估算
+        input_budget = self.translation_max_input_tokens - 100
+        output_budget = int(self.config.translation_max_tokens * 0.8)
+        
+        batches = []
+        start = 0
+        input_tokens = 0
+        output_tokens = 0
+        
+        for i, text in enumerate(texts):
+            text_tokens = estimate_tokens(text) + 4
+            text_output_tokens = int(text_tokens * 1.5)
+            
+            over_budget = (
+                input_tokens + text_tokens > input_budget or
+                output_tokens + text_output_tokens > output_budget or
+                i - start >= self.translation_batch_size
+            )
+            if over_budget and i > start:
+                batches.append((start, i))
+                start = i
+                input_tokens = 0
+                output_tokens = 0
+            
+            input_tokens += text_tokens
+            output_tokens += text_output_tokens
+        
+        if start < len(texts):
+            batches.append((start, len(texts)))
+        
+        return batches
+    
+    def _translate_batch_uncached(self, texts: List[str], target_language: str) -> List[Optional[str]]:
+        """调用LLM批量翻译（JSON按编号对齐），只重新请求缺失或格式错误的编号"""
+        if not self.llm:
+            raise ValueError("Translation client not available")
+        
+        target_lang_name = LANGUAGE_NAMES.get(target_language, target_language)
+        pending = {str(i + 1): text for i, text in enumerate(texts)}
+        translated: Dict[str, str] = {}
+        last_error: Optional[Exception] = None
+        
+        for attempt in range(self.translation_repair_attempts + 1):
+            # 将多个文本合并为一个JSON请求，减少API调用次数
+            prompt = (
+                f"将以下JSON对象中的每个值翻译为{target_lang_name}。"
+                f"返回一个JSON对象，键保持不变，值为对应的翻译结果，不要返回其他内容：\n"
+                f"{json.dumps(pending, ensure_ascii=False)}"
+            )
+            
+            try:
+                response = self.llm.invoke(prompt)
+                accepted = self._parse_batch_response(response.content, pending)
+            except Exception as e:
+                print(f"Batch translation attempt {attempt + 1} failed: {e}")
+                last_error = e
+                continue
+            
+            translated.update(accepted)
+            pending = {key: text for key, text in pending.items() if key not in accepted}
+            if not pending:
+                break
+            
+            print(f"Batch translation missing {len(pending)} of {len(texts)} ids, re-requesting")
+        
+        if not translated and last_error is not None:
+            raise RuntimeError(f"Translation API call failed: {str(last_error)}")
+        
+        if pending:
+            print(f"Batch translation left {len(pending)} segments untranslated")
+        
+        self.translation_memory.store(
+            [(texts[int(key) - 1], value) for key, value in translated.items()],
+            target_language,
+            self.config.translation_model,
+            TRANSLATION_PROMPT_VERSION
+        )
+        
+        # 重试后仍缺失的编号返回None，由生成字幕时回退到原文
+        return [translated.get(str(i + 1)) for i in range(len(texts))]
+    
+    def _parse_batch_response(self, content: str, expected: Dict[str, str]) -> Dict[str, str]:
+        """解析LLM返回的JSON，只接受键正确且值为非空字符串的条目"""
+        content = content.strip()
+        
+        # 去除可能的代码块标记和前后说明文字
+        start = content.find('{')
+        end = content.rfind('}')
+        if start == -1 or end <= start:
+            raise ValueError("Response does not contain a JSON object")
+        
+        data = json.loads(content[start:end + 1])
+        if not isinstance(data, dict):
+            raise ValueError("Response JSON is not an object")
+        
+        accepted = {}
+        for key, value in data.items():
+            key = str(key).strip()
+            if key in expected and isinstance(value, str) and value.strip():
+                accepted[key] = value.strip()
+        
+        return accepted
+    
+    async def iter_translated_batches(
+        self,
+        texts: List[str],
+        target_language: str,
+        stats: Optional[TranslationMemoryStats] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> AsyncIterator[Tuple[int, List[Optional[str]]]]:
+        """按token预算分批并发翻译，按完成顺序产出(起始下标, 译文列表)；失败批次的译文为None"""
+        # 翻译服务未配置时整体失败，而不是让每个批次失败后返回原文
+        if not self.translation_client:
+            raise ValueError("Translation client not initialized. Please check your translation API configuration.")
+        
+        ranges = self.split_translation_batches(texts)
+        semaphore = asyncio.Semaphore(self.translation_concurrency)
+        
+        report_progress(
+            progress, "translating", f"Translating {len(texts)} segments",
+            batches_done=0, batches_total=len(ranges)
+        )
         
-        for i, segment in enumerate(segments, 1):
-            start_time = self.format_timestamp(segment.start)
-            end_time = self.format_timestamp(segment.end)
-            text = segment.translated_text if is_translation and segment.translated_text else segment.text
+        async def translate_batch(start: int, end: int) -> Tuple[int, List[Optional[str]]]:
+            batch = texts[start:end]
+            batch_stats = TranslationMemoryStats()
+            async with semaphore:
+                try:
+                    translated = await asyncio.to_thread(
+                        self.translate_text_batch, batch, target_language, batch_stats
+                    )
+                except Exception as e:
+                    print(f"Translation batch failed: {e}")
+                    translated = [None] * len(batch)
             
-            srt_content += f"{i}\n"
-            srt_content += f"{start_time} --> {end_time}\n"
-            srt_content += f"{text}\n\n"
+            if stats:
+                stats.record(hits=batch_stats.hits, misses=batch_stats.misses)
+            return start, translated
+        
+        tasks = [asyncio.create_task(translate_batch(start, end)) for start, end in ranges]
+        try:
+            for batches_done, next_done in enumerate(asyncio.as_completed(tasks), 1):
+                start, translated = await next_done
+                report_progress(progress, "translating", None, batches_done=batches_done, batches_total=len(ranges))
+                yield start, translated
+        finally:
+            # 调用方提前停止迭代（如客户端断开）时取消尚未开始的批次
+            for task in tasks:
+                task.cancel()
+    
+    async def translate_texts(
+        self,
+        texts: List[str],
+        target_language: str,
+        stats: Optional[TranslationMemoryStats] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> List[Optional[str]]:
+        """按token预算分批并发翻译，保持顺序；失败批次对应位置为None"""
+        translated_texts: List[Optional[str]] = [None] * len(texts)
+        
+        async for start, translated in self.iter_translated_batches(texts, target_language, stats, progress):
+            translated_texts[start:start + len(translated)] = translated
         
-        return srt_content
+        return translated_texts
+    
+    def _completion_message(self, message: str, failed_count: int) -> str:
+        """生成完成消息，包含翻译失败的片段数"""
+        if failed_count:
+            message += f" (Note: {failed_count} segments failed to translate and were left in original language)"
+        return message
+    
+    def generate_srt(self, segments: Union[SegmentStore, List[SubtitleSegment]], is_translation: bool = False) -> str:
+        """生成SRT格式字幕"""
+        if isinstance(segments, SegmentStore):
+            return render_srt(segments.entries(is_translation))
+        return render_srt(segment_entries(segments, is_translation))
     
     def format_timestamp(self, seconds: float) -> str:
         """格式化时间戳为SRT格式"""
-        hours = int(seconds // 3600)
-        minutes = int((seconds % 3600) // 60)
-        secs = int(seconds % 60)
-        milliseconds = int((seconds % 1) * 1000)
+        return format_timestamp(seconds)
+    
+    async def _transcribe_once(
+        self,
+        cache_key: str,
+        audio_file_path: str,
+        source_language: LanguageCode,
+        progress: Optional[ProgressCallback] = None
+    ) -> SegmentStore:
+        """转录并写入缓存；相同内容正在转录时等待其结果
+
+        进行中的转录失败后，第一个被唤醒的等待者接手重新转录，其余等待者继续等待它的结果
+        """
+        while True:
+            pending = self._inflight_transcriptions.get(cache_key)
+            if pending is None:
+                break
+            
+            report_progress(progress, "waiting_duplicate", "Waiting for identical media being transcribed")
+            columns = await asyncio.shield(pending)
+            if columns is not None:
+                # 每个任务使用独立副本，翻译结果写入片段时互不影响
+                return SegmentStore.from_columns(columns)
         
-        return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_transcriptions[cache_key] = future
+        segments = None
+        try:
+            # 转录音频，视频和ASR不支持的格式按需复制音轨或转码
+            segments = await self.transcribe_media(audio_file_path, source_language, progress)
+            if segments:
+                await asyncio.to_thread(self.transcription_cache.put, cache_key, segments)
+            return segments
+        finally:
+            if self._inflight_transcriptions.get(cache_key) is future:
+                del self._inflight_transcriptions[cache_key]
+            future.set_result(segments.to_columns() if segments is not None else None)
     
-    def process_audio_file(self, audio_file_path: str, request: SubtitleRequest) -> SubtitleResponse:
-        """处理音频文件"""
+    async def process_audio_file(
+        self,
+        audio_file_path: str,
+        request: SubtitleRequest,
+        content_hash: Optional[str] = None,
+        progress: Optional[ProgressCallback] = None
+    ) -> SubtitleResponse:
+        """处理音频文件，progress用于上报各阶段进度"""
         try:
-            # 检查是否为视频文件并提取音频
-            if self.is_video_file(audio_file_path):
-                print(f"Detected video file, extracting audio...")
-                audio_file_path = self.extract_audio_from_video(audio_file_path)
+            # 按内容哈希查询转录缓存
+            report_progress(progress, "checking_cache", "Checking transcription cache")
+            if content_hash is None:
+                content_hash = await asyncio.to_thread(hash_file, audio_file_path)
+            cache_key = self.transcription_cache.make_key(
+                content_hash, request.source_language.value, self.asr_client.asr_params
+            )
+            segments = await asyncio.to_thread(self.transcription_cache.get, cache_key)
             
-            # 转录音频
-            segments = self.transcribe_audio(audio_file_path, request.source_language)
+            if segments is not None:
+                print(f"Transcription cache hit for {content_hash}")
+                report_progress(progress, "cache_hit", "Using cached transcription")
+            else:
+                segments = await self._transcribe_once(cache_key, audio_file_path, request.source_language, progress)
             
             if not segments:
                 return SubtitleResponse(
@@ -488,29 +788,38 @@ class AudioSubtitleService:
                 )
             
             # 生成原始字幕
+            report_progress(progress, "generating_srt", f"Transcribed {len(segments)} segments")
             original_srt = self.generate_srt(segments, is_translation=False)
             
             # 翻译字幕
             translated_srt = None
+            translation_stats = None
+            failed_count = 0
             if request.translate and request.target_language != request.source_language:
-                for segment in segments:
-                    translated_text = self.translate_text(segment.text, request.target_language)
-                    segment.translated_text = translated_text
+                translation_stats = TranslationMemoryStats()
+                translated_texts = await self.translate_texts(
+                    segments.texts(), request.target_language, translation_stats, progress
+                )
+                segments.set_translations(translated_texts)
+                failed_count = translated_texts.count(None)
                 
                 translated_srt = self.generate_srt(segments, is_translation=True)
+                print(f"Translation memory hit rate: {translation_stats.hit_rate:.0%}")
             
             # 计算时长和片段数量
-            duration = segments[-1].end - segments[0].start if segments else 0
+            duration = segments.duration
             segment_count = len(segments)
             
             return SubtitleResponse(
                 success=True,
-                message="Audio processing completed successfully.",
-                segments=segments,
+                message=self._completion_message("Audio processing completed successfully.", failed_count),
+                segments=segments.to_segments(),
                 original_srt=original_srt,
                 translated_srt=translated_srt,
                 duration=duration,
-                segment_count=segment_count
+                segment_count=segment_count,
+                translation_memory_hits=translation_stats.hits if translation_stats else None,
+                translation_memory_misses=translation_stats.misses if translation_stats else None
             )
             
         except Exception as e:
@@ -546,8 +855,13 @@ class AudioSubtitleService:
         # 检查URL是否以音频扩展名结尾
         return any(url.lower().endswith(ext) for ext in audio_extensions)
     
-    def process_url(self, url: str, request: SubtitleRequest) -> SubtitleResponse:
-        """处理在线URL音视频"""
+    async def process_url(
+        self,
+        url: str,
+        request: SubtitleRequest,
+        progress: Optional[ProgressCallback] = None
+    ) -> SubtitleResponse:
+        """处理在线URL音视频，progress用于上报各阶段进度"""
         try:
             # 验证URL
             if not self.validate_url(url):
@@ -572,7 +886,7 @@ class AudioSubtitleService:
             print(f"Processing audio from URL: {url}")
             
             # 直接使用URL进行音频转录
-            segments = self.transcribe_audio_from_url(url, request.source_language)
+            segments = await self.transcribe_audio_from_url(url, request.source_language, progress)
             
             if not segments:
                 return SubtitleResponse(
@@ -584,29 +898,38 @@ class AudioSubtitleService:
                 )
             
             # 生成原始字幕
+            report_progress(progress, "generating_srt", f"Transcribed {len(segments)} segments")
             original_srt = self.generate_srt(segments, is_translation=False)
             
             # 翻译字幕
             translated_srt = None
+            translation_stats = None
+            failed_count = 0
             if request.translate and request.target_language != request.source_language:
-                for segment in segments:
-                    translated_text = self.translate_text(segment.text, request.target_language)
-                    segment.translated_text = translated_text
+                translation_stats = TranslationMemoryStats()
+                translated_texts = await self.translate_texts(
+                    segments.texts(), request.target_language, translation_stats, progress
+                )
+                segments.set_translations(translated_texts)
+                failed_count = translated_texts.count(None)
                 
                 translated_srt = self.generate_srt(segments, is_translation=True)
+                print(f"Translation memory hit rate: {translation_stats.hit_rate:.0%}")
             
             # 计算时长和片段数量
-            duration = segments[-1].end - segments[0].start if segments else 0
+            duration = segments.duration
             segment_count = len(segments)
             
             return SubtitleResponse(
                 success=True,
-                message="URL processing completed successfully.",
-                segments=segments,
+                message=self._completion_message("URL processing completed successfully.", failed_count),
+                segments=segments.to_segments(),
                 original_srt=original_srt,
                 translated_srt=translated_srt,
                 duration=duration,
-                segment_count=segment_count
+                segment_count=segment_count,
+                translation_memory_hits=translation_stats.hits if translation_stats else None,
+                translation_memory_misses=translation_stats.misses if translation_stats else None
             )
                 
         except Exception as e:
@@ -620,108 +943,22 @@ class AudioSubtitleService:
     
     def validate_srt_format(self, srt_content: str) -> bool:
         """验证SRT格式"""
-        try:
-            lines = srt_content.strip().split('\n')
-            if len(lines) < 3:
-                return False
-            
-            # 检查基本SRT结构
-            line_index = 0
-            while line_index < len(lines):
-                # 序号行
-                if not lines[line_index].strip().isdigit():
-                    return False
-                line_index += 1
-                
-                # 时间戳行
-                if line_index >= len(lines) or ' --> ' not in lines[line_index]:
-                    return False
-                line_index += 1
-                
-                # 文本行
-                if line_index >= len(lines) or not lines[line_index].strip():
-                    return False
-                line_index += 1
-                
-                # 空行
-                if line_index < len(lines) and lines[line_index].strip():
-                    return False
-                line_index += 1
-            
-            return True
-        except Exception:
-            return False
+        return validate_srt(srt_content) is None
     
     def parse_srt(self, srt_content: str) -> List[Dict]:
-        """解析SRT文件"""
-        segments = []
-        lines = srt_content.strip().split('\n')
-        
-        i = 0
-        while i < len(lines):
-            # 序号行
-            if not lines[i].strip().isdigit():
-                i += 1
-                continue
-            
-            # 时间戳行
-            if i + 1 >= len(lines):
-                break
-            
-            time_line = lines[i + 1]
-            if ' --> ' not in time_line:
-                i += 1
-                continue
-            
-            # 解析时间戳
-            time_parts = time_line.split(' --> ')
-            if len(time_parts) != 2:
-                i += 1
-                continue
-            
-            start_time = self.parse_timestamp(time_parts[0].strip())
-            end_time = self.parse_timestamp(time_parts[1].strip())
-            
-            # 文本行
-            text_lines = []
-            i += 2
-            while i < len(lines) and lines[i].strip():
-                text_lines.append(lines[i].strip())
-                i += 1
-            
-            if text_lines:
-                segments.append({
-                    'text': ' '.join(text_lines),
-                    'start': start_time,
-                    'end': end_time
-                })
-            
-            i += 1
-        
-        return segments
+        """解析SRT文件，格式错误时抛出SRTParseError"""
+        return [
+            {'text': cue.text, 'start': cue.start, 'end': cue.end}
+            for cue in parse_srt(srt_content)
+        ]
     
     def parse_timestamp(self, timestamp: str) -> float:
         """解析SRT时间戳"""
-        # 格式: HH:MM:SS,mmm 或 HH:MM:SS.mmm
-        if ',' in timestamp:
-            time_part, ms_part = timestamp.split(',')
-        else:
-            time_part, ms_part = timestamp.split('.')
-        
-        h, m, s = time_part.split(':')
-        return int(h) * 3600 + int(m) * 60 + int(s) + int(ms_part) / 1000.0
+        return parse_timestamp(timestamp)
     
     def generate_srt_from_segments(self, segments: List[Dict]) -> str:
         """从片段生成SRT格式"""
-        srt_content = ""
-        
-        for i, segment in enumerate(segments, 1):
-            start_time = self.format_timestamp(segment['start'])
-            end_time = self.format_timestamp(segment['end'])
-            text = segment.get('translated_text', segment['text'])
-            
-            srt_content += f"{i}\n"
-            srt_content += f"{start_time} --> {end_time}\n"
-            srt_content += f"{text}\n\n"
-        
-        return srt_content
\ No newline at end of file
+        return render_srt(
+            (segment['start'], segment['end'], segment.get('translated_text', segment['text']))
+            for segment in segments
+        )
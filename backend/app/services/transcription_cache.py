@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..models.segment_store import SegmentStore
+
+
+class TranscriptionCache:
+    """基于内容哈希的转录结果持久化缓存（SQLite + LRU淘汰）"""
+
+    def __init__(self, db_path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.db_path = Path(db_path or os.getenv("TRANSCRIPTION_CACHE_PATH", "cache/transcriptions.db"))
+        self.max_bytes = max_bytes or int(os.getenv("TRANSCRIPTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcriptions (
+                key TEXT PRIMARY KEY,
+                segments TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_transcriptions_last_access ON transcriptions (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(content_hash: str, source_language: str, asr_params: Dict) -> str:
+        """由音频哈希、源语言和ASR参数生成缓存键"""
+        raw = json.dumps(
+            {"hash": content_hash, "language": source_language, "params": asr_params},
+            sort_keys=True
+        )
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[SegmentStore]:
+        """查询缓存，命中时刷新访问时间；不是列格式的条目按未命中处理"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segments FROM transcriptions WHERE key = ?", (key,)
+            ).fetchone()
+
+            data = json.loads(row[0]) if row is not None else None
+            if not isinstance(data, dict):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE transcriptions SET last_access = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+
+        return SegmentStore.from_columns(data)
+
+    def put(self, key: str, segments: SegmentStore):
+        """写入缓存，并按总大小淘汰最久未使用的条目"""
+        payload = json.dumps(segments.to_columns(), ensure_ascii=False)
+        size = len(payload.encode('utf-8'))
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcriptions (key, segments, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, size, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """淘汰最久未使用的条目直到总大小低于上限"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcriptions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute(
+            "SELECT key, size FROM transcriptions ORDER BY last_access ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM transcriptions WHERE key = ?", (key,))
+            total -= size
+
+    def stats(self) -> Dict:
+        """缓存统计信息"""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcriptions"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,158 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+@dataclass
+class TranslationMemoryStats:
+    """单个任务的翻译记忆命中统计"""
+    hits: int = 0
+    misses: int = 0
+
+    def record(self, hits: int = 0, misses: int = 0):
+        self.hits += hits
+        self.misses += misses
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class TranslationMemory:
+    """片段级翻译记忆（SQLite + LRU淘汰），所有翻译路径共用"""
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: Optional[int] = None):
+        self.db_path = Path(db_path or os.getenv("TRANSLATION_MEMORY_PATH", "cache/translation_memory.db"))
+        self.max_entries = max_entries or int(os.getenv("TRANSLATION_MEMORY_MAX_ENTRIES", "200000"))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translations (
+                key TEXT PRIMARY KEY,
+                translation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_translations_last_access ON translations (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """规范化原文：去除首尾空白并合并连续空白"""
+        return re.sub(r'\s+', ' ', text).strip()
+
+    def make_key(self, text: str, target_language: str, model: str, prompt_version: str) -> str:
+        """由规范化原文、目标语言、模型和提示词版本生成键"""
+        raw = "\x1f".join([self.normalize(text), target_language, model, prompt_version])
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def lookup(
+        self,
+        texts: Sequence[str],
+        target_language: str,
+        model: str,
+        prompt_version: str
+    ) -> List[Optional[str]]:
+        """批量查询翻译，未命中的位置为None"""
+        keys = [self.make_key(text, target_language, model, prompt_version) for text in texts]
+        found: Dict[str, str] = {}
+
+        with self._lock:
+            # 分批查询，避免超过SQLite参数数量限制
+            for i in range(0, len(keys), 500):
+                batch = list(set(keys[i:i + 500]))
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, translation FROM translations WHERE key IN ({placeholders})", batch
+                ).fetchall()
+                found.update(rows)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE translations SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+            results = [found.get(key) for key in keys]
+            hits = sum(1 for result in results if result is not None)
+            self.hits += hits
+            self.misses += len(results) - hits
+
+        return results
+
+    def store(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        target_language: str,
+        model: str,
+        prompt_version: str
+    ):
+        """写入(原文, 译文)对，并淘汰最久未使用的条目"""
+        now = time.time()
+        rows = [
+            (self.make_key(text, target_language, model, prompt_version), translation, now, now)
+            for text, translation in pairs
+            if text.strip() and translation
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, translation, created_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """超过条目上限时淘汰最久未使用的条目"""
+        count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return
+
+        self._conn.execute(
+            "DELETE FROM translations WHERE key IN "
+            "(SELECT key FROM translations ORDER BY last_access ASC LIMIT ?)",
+            (excess,)
+        )
+
+    def stats(self) -> Dict:
+        """翻译记忆统计信息"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,219 @@
+import os
+import sqlite3
+import threading
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+
+@dataclass
+class UploadRecord:
+    """已上传文件的索引记录"""
+    file_id: str
+    path: str
+    filename: str
+    file_size: int
+    file_hash: Optional[str]
+    content_type: Optional[str]
+    is_video: bool
+    created_at: float
+    modified_at: float
+    # 最近一次被任务使用的时间，用于按LRU回收空间
+    accessed_at: float = 0.0
+
+    def __post_init__(self):
+        if not self.accessed_at:
+            self.accessed_at = self.modified_at
+
+
+def _is_file_id(name: str) -> bool:
+    """上传文件名为UUID，忽略目录中的其他文件"""
+    try:
+        uuid.UUID(name)
+        return True
+    except ValueError:
+        return False
+
+
+class UploadIndex:
+    """上传文件索引 - 内存字典提供O(1)查询，SQLite持久化，启动时与上传目录对账
+
+    内容哈希相同的上传共享同一个存储文件，按引用计数，最后一条记录删除后才删除文件
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = Path(db_path or os.getenv("UPLOAD_INDEX_PATH", "cache/uploads.db"))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS uploads (
+                file_id TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                file_size INTEGER NOT NULL,
+                file_hash TEXT,
+                content_type TEXT,
+                is_video INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                modified_at REAL NOT NULL,
+                accessed_at REAL NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(uploads)")}
+        if "accessed_at" not in columns:
+            self._conn.execute("ALTER TABLE uploads ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+        self._records: Dict[str, UploadRecord] = {
+            row[0]: UploadRecord(*row[:6], bool(row[6]), *row[7:])
+            for row in self._conn.execute(
+                "SELECT file_id, path, filename, file_size, file_hash, content_type, is_video, "
+                "created_at, modified_at, accessed_at FROM uploads"
+            )
+        }
+        # 存储文件路径的引用计数，以及内容哈希到存储文件的映射
+        self._refs: Dict[str, int] = {}
+        self._blobs: Dict[str, str] = {}
+        for record in self._records.values():
+            self._link(record)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, file_id: str) -> Optional[UploadRecord]:
+        """按文件ID查询"""
+        return self._records.get(file_id)
+
+    def records(self) -> List[UploadRecord]:
+        """所有记录的快照"""
+        with self._lock:
+            return list(self._records.values())
+
+    def _link(self, record: UploadRecord):
+        self._refs[record.path] = self._refs.get(record.path, 0) + 1
+        if record.file_hash:
+            self._blobs.setdefault(record.file_hash, record.path)
+
+    def _unlink(self, record: UploadRecord):
+        count = self._refs.get(record.path, 0) - 1
+        if count > 0:
+            self._refs[record.path] = count
+            return
+
+        self._refs.pop(record.path, None)
+        if record.file_hash and self._blobs.get(record.file_hash) == record.path:
+            del self._blobs[record.file_hash]
+
+    def find_blob(self, file_hash: str) -> Optional[str]:
+        """按内容哈希查找已存储的文件路径"""
+        with self._lock:
+            return self._blobs.get(file_hash)
+
+    def is_referenced(self, path: str) -> bool:
+        """存储文件是否仍被记录引用"""
+        with self._lock:
+            return path in self._refs
+
+    def referenced_paths(self) -> Set[str]:
+        """所有被引用的存储文件路径"""
+        with self._lock:
+            return set(self._refs)
+
+    def add(self, record: UploadRecord) -> UploadRecord:
+        """新增或覆盖记录；已存在相同内容哈希的文件时记录指向该文件，返回实际登记的记录"""
+        with self._lock:
+            if record.file_hash and record.file_hash in self._blobs:
+                record.path = self._blobs[record.file_hash]
+
+            previous = self._records.get(record.file_id)
+            if previous is not None:
+                self._unlink(previous)
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploads (file_id, path, filename, file_size, file_hash, content_type, "
+                "is_video, created_at, modified_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    record.file_id, record.path, record.filename, record.file_size, record.file_hash,
+                    record.content_type, int(record.is_video), record.created_at, record.modified_at,
+                    record.accessed_at
+                )
+            )
+            self._conn.commit()
+            self._records[record.file_id] = record
+            self._link(record)
+            return record
+
+    def touch(self, file_id: str, timestamp: float):
+        """更新最近访问时间"""
+        with self._lock:
+            record = self._records.get(file_id)
+            if record is None:
+                return
+            record.accessed_at = timestamp
+            self._conn.execute("UPDATE uploads SET accessed_at = ? WHERE file_id = ?", (timestamp, file_id))
+            self._conn.commit()
+
+    @property
+    def total_bytes(self) -> int:
+        """已登记文件的总大小，共享的存储文件只计算一次"""
+        with self._lock:
+            return sum({record.path: record.file_size for record in self._records.values()}.values())
+
+    @property
+    def blob_count(self) -> int:
+        """实际存储的文件数量"""
+        with self._lock:
+            return len(self._refs)
+
+    def remove(self, file_id: str) -> Optional[UploadRecord]:
+        """删除记录，返回被删除的记录；存储文件是否还被引用由is_referenced判断"""
+        with self._lock:
+            record = self._records.pop(file_id, None)
+            if record is not None:
+                self._unlink(record)
+                self._conn.execute("DELETE FROM uploads WHERE file_id = ?", (file_id,))
+                self._conn.commit()
+            return record
+
+    def rebuild(self, upload_dir: Path, is_video_file: Callable[[str], bool]) -> Dict[str, int]:
+        """与上传目录对账：删除文件已不存在的记录，补充未登记的文件（只扫描一次目录）"""
+        on_disk = {
+            str(path): path for path in upload_dir.iterdir()
+            if path.is_file() and _is_file_id(path.stem)
+        }
+
+        stale = [file_id for file_id, record in self._records.items() if record.path not in on_disk]
+        for file_id in stale:
+            self.remove(file_id)
+
+        added = 0
+        for key, path in on_disk.items():
+            file_id = path.stem
+            if key in self._refs or file_id in self._records:
+                continue
+            stat = path.stat()
+            self.add(UploadRecord(
+                file_id=file_id,
+                path=str(path),
+                filename=path.name,
+                file_size=stat.st_size,
+                file_hash=None,
+                content_type=None,
+                is_video=is_video_file(path.name),
+                created_at=stat.st_mtime,
+                modified_at=stat.st_mtime
+            ))
+            added += 1
+
+        return {"entries": len(self._records), "added": added, "removed": len(stale)}
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
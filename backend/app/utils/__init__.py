@@ -4,9 +4,23 @@ from .helpers import (
     validate_srt_format,
     parse_srt_content,
     generate_srt_content,
+    hash_file,
+    estimate_tokens,
     sanitize_filename,
     get_file_mime_type
 )
+from .srt import (
+    SRTCue,
+    SRTParseError,
+    format_timestamp,
+    iter_srt,
+    iter_srt_chunks,
+    parse_srt,
+    parse_timestamp,
+    render_srt,
+    segment_entries,
+    validate_srt
+)
 
 
 __all__ = [
@@ -15,6 +29,18 @@ __all__ = [
     "validate_srt_format",
     "parse_srt_content",
     "generate_srt_content",
+    "hash_file",
+    "estimate_tokens",
     "sanitize_filename",
-    "get_file_mime_type"
+    "get_file_mime_type",
+    "SRTCue",
+    "SRTParseError",
+    "format_timestamp",
+    "iter_srt",
+    "iter_srt_chunks",
+    "render_srt",
+    "parse_srt",
+    "parse_timestamp",
+    "segment_entries",
+    "validate_srt"
 ]
\ No newline at end of file
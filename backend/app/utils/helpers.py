@@ -1,8 +1,11 @@
 import os
 import re
+import hashlib
 from typing import List, Dict, Optional
 from pathlib import Path
 
+from .srt import format_timestamp, parse_srt, render_srt, validate_srt
+
 
 def validate_file_type(filename: str, allowed_extensions: List[str]) -> bool:
     """验证文件类型"""
@@ -26,110 +29,43 @@ def format_file_size(size_bytes: int) -> str:
 
 def validate_srt_format(content: str) -> bool:
     """验证SRT格式"""
-    try:
-        lines = content.strip().split('\n')
-        if len(lines) < 3:
-            return False
-        
-        # 检查基本SRT结构
-        line_index = 0
-        segment_count = 0
-        
-        while line_index < len(lines):
-            # 序号行
-            if not lines[line_index].strip().isdigit():
-                return False
-            line_index += 1
-            
-            # 时间戳行
-            if line_index >= len(lines):
-                return False
-            
-            time_line = lines[line_index].strip()
-            if not re.match(r'\d{2}:\d{2}:\d{2},\d{3} --> \d{2}:\d{2}:\d{2},\d{3}', time_line):
-                return False
-            line_index += 1
-            
-            # 文本行
-            if line_index >= len(lines) or not lines[line_index].strip():
-                return False
-            
-            # 读取所有文本行
-            while line_index < len(lines) and lines[line_index].strip():
-                line_index += 1
-            
-            # 空行
-            if line_index < len(lines) and lines[line_index].strip():
-                return False
-            line_index += 1
-            
-            segment_count += 1
-        
-        return segment_count > 0
-    except Exception:
-        return False
+    return validate_srt(content) is None
 
 
 def parse_srt_content(content: str) -> List[Dict]:
-    """解析SRT内容"""
-    segments = []
-    lines = content.strip().split('\n')
-    
-    line_index = 0
-    while line_index < len(lines):
-        # 序号
-        if not lines[line_index].strip().isdigit():
-            line_index += 1
-            continue
-        
-        segment_num = int(lines[line_index].strip())
-        line_index += 1
-        
-        # 时间戳
-        if line_index >= len(lines):
-            break
-        
-        time_line = lines[line_index].strip()
-        time_match = re.match(r'(\d{2}:\d{2}:\d{2},\d{3}) --> (\d{2}:\d{2}:\d{2},\d{3})', time_line)
-        if not time_match:
-            line_index += 1
-            continue
-        
-        start_time = time_match.group(1)
-        end_time = time_match.group(2)
-        line_index += 1
-        
-        # 文本
-        text_lines = []
-        while line_index < len(lines) and lines[line_index].strip():
-            text_lines.append(lines[line_index].strip())
-            line_index += 1
-        
-        text = ' '.join(text_lines)
-        
-        segments.append({
-            'index': segment_num,
-            'start_time': start_time,
-            'end_time': end_time,
-            'text': text
-        })
-        
-        # 跳过空行
-        line_index += 1
-    
-    return segments
+    """解析SRT内容，格式错误时抛出SRTParseError"""
+    return [
+        {
+            'index': cue.index,
+            'start_time': format_timestamp(cue.start),
+            'end_time': format_timestamp(cue.end),
+            'text': cue.text
+        }
+        for cue in parse_srt(content)
+    ]
 
 
 def generate_srt_content(segments: List[Dict]) -> str:
     """生成SRT内容"""
-    srt_content = ""
-    
-    for i, segment in enumerate(segments, 1):
-        srt_content += f"{i}\n"
-        srt_content += f"{segment['start_time']} --> {segment['end_time']}\n"
-        srt_content += f"{segment['text']}\n\n"
-    
-    return srt_content
+    return render_srt(
+        (segment['start_time'], segment['end_time'], segment['text'])
+        for segment in segments
+    )
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """分块计算文件SHA-256"""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算文本的token数：CJK字符约1个token，其他字符约4个字符1个token"""
+    cjk_count = len(re.findall(r'[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af\uf900-\ufaff]', text))
+    return cjk_count + (len(text) - cjk_count + 3) // 4
 
 
 def sanitize_filename(filename: str) -> str:
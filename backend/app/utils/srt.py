@@ -0,0 +1,150 @@
+import re
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+
+Timestamp = Union[float, str]
+
+_INDEX_RE = re.compile(r'^\s*(\d+)\s*$')
+_TIMING_RE = re.compile(
+    r'^\s*(\d{1,2}):(\d{2}):(\d{2})[,.](\d{1,3})\s*-->\s*(\d{1,2}):(\d{2}):(\d{2})[,.](\d{1,3})(?:\s.*)?$'
+)
+
+
+class SRTCue(NamedTuple):
+    """解析后的字幕条目"""
+    index: int
+    start: float
+    end: float
+    text: str
+
+
+class SRTParseError(ValueError):
+    """SRT格式错误，line为出错的行号（从1开始）"""
+
+    def __init__(self, line: int, message: str):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+        self.message = message
+
+
+def _timing_seconds(h: str, m: str, s: str, ms: str) -> float:
+    # 毫秒位数不足3位时按小数处理，如 ",5" 表示500毫秒
+    return int(h) * 3600 + int(m) * 60 + int(s) + int(ms.ljust(3, '0')) / 1000.0
+
+
+def parse_timestamp(timestamp: str) -> float:
+    """解析SRT时间戳，支持 HH:MM:SS,mmm 和 HH:MM:SS.mmm"""
+    match = re.match(r'^\s*(\d{1,2}):(\d{2}):(\d{2})[,.](\d{1,3})\s*$', timestamp)
+    if not match:
+        raise ValueError(f"Invalid timestamp: {timestamp}")
+    return _timing_seconds(*match.groups())
+
+
+def format_timestamp(seconds: float) -> str:
+    """格式化时间戳为SRT格式 HH:MM:SS,mmm"""
+    total_ms = int(round(seconds * 1000))
+    hours, remainder = divmod(total_ms, 3600000)
+    minutes, remainder = divmod(remainder, 60000)
+    secs, milliseconds = divmod(remainder, 1000)
+
+    return f"{hours:02d}:{minutes:02d}:{secs:02d},{milliseconds:03d}"
+
+
+def segment_entries(segments: Iterable[Any], is_translation: bool = False) -> Iterator[Tuple[float, float, str]]:
+    """将字幕片段转换为(开始, 结束, 文本)序列，翻译模式下优先使用译文"""
+    for segment in segments:
+        text = segment.translated_text if is_translation and segment.translated_text else segment.text
+        yield segment.start, segment.end, text
+
+
+def iter_srt(entries: Iterable[Tuple[Timestamp, Timestamp, str]]) -> Iterator[str]:
+    """逐条生成SRT字幕块，entries为(开始, 结束, 文本)，时间可以是秒数或已格式化的字符串"""
+    for i, (start, end, text) in enumerate(entries, 1):
+        start_time = start if isinstance(start, str) else format_timestamp(start)
+        end_time = end if isinstance(end, str) else format_timestamp(end)
+        yield f"{i}\n{start_time} --> {end_time}\n{text}\n\n"
+
+
+def iter_srt_chunks(
+    entries: Iterable[Tuple[Timestamp, Timestamp, str]],
+    chunk_size: int = 64 * 1024
+) -> Iterator[str]:
+    """将字幕块合并为约chunk_size大小的片段，用于流式响应"""
+    buffer = []
+    size = 0
+
+    for block in iter_srt(entries):
+        buffer.append(block)
+        size += len(block)
+        if size >= chunk_size:
+            yield "".join(buffer)
+            buffer = []
+            size = 0
+
+    if buffer:
+        yield "".join(buffer)
+
+
+def render_srt(entries: Iterable[Tuple[Timestamp, Timestamp, str]]) -> str:
+    """生成完整SRT内容，线性时间拼接"""
+    return "".join(iter_srt(entries))
+
+
+def parse_srt(content: str) -> List[SRTCue]:
+    """单次遍历同时校验并解析SRT，兼容CRLF和BOM，遇到第一个错误时抛出SRTParseError"""
+    lines = content.lstrip('\ufeff').splitlines()
+    cues: List[SRTCue] = []
+    total = len(lines)
+    i = 0
+
+    while i < total:
+        # 跳过字幕块之间的空行
+        if not lines[i].strip():
+            i += 1
+            continue
+
+        # 序号行
+        index_match = _INDEX_RE.match(lines[i])
+        if not index_match:
+            raise SRTParseError(i + 1, "expected subtitle index")
+        index = int(index_match.group(1))
+        i += 1
+
+        # 时间戳行
+        if i >= total:
+            raise SRTParseError(i, "missing timestamp line")
+        timing_match = _TIMING_RE.match(lines[i])
+        if not timing_match:
+            raise SRTParseError(i + 1, "invalid timestamp line")
+        groups = timing_match.groups()
+        start = _timing_seconds(*groups[:4])
+        end = _timing_seconds(*groups[4:])
+        i += 1
+
+        # 文本行，直到空行为止
+        text_start = i
+        while i < total and lines[i].strip():
+            i += 1
+        if i == text_start:
+            raise SRTParseError(text_start + 1, "missing subtitle text")
+
+        cues.append(SRTCue(
+            index=index,
+            start=start,
+            end=end,
+            text=' '.join(line.strip() for line in lines[text_start:i])
+        ))
+
+    if not cues:
+        raise SRTParseError(1, "no subtitles found")
+
+    return cues
+
+
+def validate_srt(content: str) -> Optional[SRTParseError]:
+    """校验SRT格式，返回第一个错误，格式正确时返回None"""
+    try:
+        parse_srt(content)
+    except SRTParseError as e:
+        return e
+    return None
@@ -26,6 +26,7 @@ pip install -r requirements.txt
 echo "📁 创建必要的目录..."
 mkdir -p uploads
 mkdir -p logs
+mkdir -p cache
 
 # 检查环境变量文件
 if [ ! -f ".env" ]; then
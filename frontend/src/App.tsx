@@ -33,7 +33,8 @@ import FileUpload from './components/FileUpload';
 import VideoUrlInput from './components/VideoUrlInput';
 import SubtitlePreview from './components/SubtitlePreview';
 import { useSubtitleProcessing } from './hooks/useSubtitleProcessing';
-import { translateSubtitles } from './services/api';
+import { translateSubtitlesStream } from './services/api';
+import { generateSRT } from './utils/helpers';
 import { SubtitleRequest, SubtitleResponse } from './types';
 
 const { Header, Content, Footer } = Layout;
@@ -479,7 +480,27 @@ const AppContent: React.FC = () => {
     
     setIsTranslating(true);
     try {
-      const result = await translateSubtitles(subtitleData.originalSrt, translateTargetLanguage);
+      // 译文按批次到达，先显示已翻译的片段
+      const received: Record<number, { index: number; start_time: string; end_time: string; text: string }> = {};
+      const result = await translateSubtitlesStream(
+        subtitleData.originalSrt,
+        translateTargetLanguage,
+        (segments) => {
+          segments.forEach(segment => {
+            received[segment.index] = {
+              index: segment.index,
+              start_time: segment.start_time,
+              end_time: segment.end_time,
+              text: segment.translated_text || segment.text
+            };
+          });
+          const partial = Object.values(received).sort((a, b) => a.index - b.index);
+          setSubtitleData(prev => ({
+            ...prev,
+            translatedSrt: generateSRT(partial)
+          }));
+        }
+      );
       
       if (result.success && result.translated_srt) {
         setSubtitleData(prev => ({
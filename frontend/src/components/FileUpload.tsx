@@ -15,7 +15,7 @@ interface FileUploadProps {
 const FileUpload: React.FC<FileUploadProps> = ({
   onFileSelect,
   disabled = false,
-  maxSize = 100 * 1024 * 1024, // 100MB
+  maxSize = 4 * 1024 * 1024 * 1024, // 4GB，大文件分块上传
 }) => {
   const [fileInfo, setFileInfo] = useState<File | null>(null);
   const [error, setError] = useState<string>('');
@@ -2,7 +2,46 @@ import { useState, useCallback } from 'react';
 import { useMutation, useQueryClient } from '@tanstack/react-query';
 import { message } from 'antd';
 import { uploadFile, generateSubtitles, processUrl as processUrlApi } from '../services/api';
-import { ProcessingStatus, FileUploadResponse, SubtitleResponse, SubtitleRequest } from '../types';
+import {
+  ProcessingStatus,
+  FileUploadResponse,
+  SubtitleResponse,
+  SubtitleRequest,
+  JobProgressEvent
+} from '../types';
+
+const STAGE_MESSAGES: Record<string, string> = {
+  queued: '排队中...',
+  processing: '正在处理...',
+  checking_cache: '正在检查转录缓存...',
+  cache_hit: '已使用缓存的转录结果',
+  waiting_duplicate: '相同文件正在识别，等待结果...',
+  extracting_audio: '正在从视频中提取音频...',
+  splitting_audio: '正在切分长音频...',
+  submitting_asr: '正在提交语音识别...',
+  transcribing: '正在识别语音...',
+  translating: '正在翻译字幕...',
+  generating_srt: '正在生成字幕...',
+};
+
+// 根据任务进度事件生成状态文本和进度
+const describeProgress = (event: JobProgressEvent): Partial<ProcessingStatus> => {
+  const { progress = {} } = event;
+  let text = STAGE_MESSAGES[event.stage || ''] || event.message || '正在处理...';
+
+  if (progress.batches_total) {
+    text += ` (${progress.batches_done}/${progress.batches_total})`;
+    return { message: text, progress: Math.round((progress.batches_done / progress.batches_total) * 100) };
+  }
+  if (progress.chunks_total) {
+    text += ` (${progress.chunks_done}/${progress.chunks_total})`;
+    return { message: text, progress: Math.round((progress.chunks_done / progress.chunks_total) * 100) };
+  }
+  if (progress.poll_attempt) {
+    text += ` (#${progress.poll_attempt})`;
+  }
+  return { message: text };
+};
 
 export const useSubtitleProcessing = () => {
   const queryClient = useQueryClient();
@@ -11,9 +50,27 @@ export const useSubtitleProcessing = () => {
     message: '',
   });
 
+  // 任务进度事件只更新处理中的状态
+  const handleJobProgress = useCallback((event: JobProgressEvent) => {
+    setProcessingStatus(prev =>
+      prev.status === 'processing'
+        ? { ...prev, ...describeProgress(event) }
+        : prev
+    );
+  }, []);
+
+  // 分块上传时更新上传进度
+  const handleUploadProgress = useCallback((uploaded: number, total: number) => {
+    setProcessingStatus(prev =>
+      prev.status === 'uploading'
+        ? { ...prev, progress: Math.round((uploaded / total) * 100) }
+        : prev
+    );
+  }, []);
+
   // 上传文件
   const uploadFileMutation = useMutation({
-    mutationFn: uploadFile,
+    mutationFn: (file: File) => uploadFile(file, handleUploadProgress),
     onMutate: () => {
       setProcessingStatus({
         status: 'uploading',
@@ -27,7 +84,7 @@ export const useSubtitleProcessing = () => {
           status: 'idle',
           message: '文件上传成功',
         });
-        message.success('文件上传成功');
+        message.success(data.deduplicated ? '文件内容与已上传文件相同，已复用' : '文件上传成功');
         return data.file_id;
       } else {
         setProcessingStatus({
@@ -50,7 +107,7 @@ export const useSubtitleProcessing = () => {
   // 生成字幕
   const generateSubtitlesMutation = useMutation({
     mutationFn: ({ file_id, request }: { file_id: string; request: SubtitleRequest }) =>
-      generateSubtitles(file_id, request),
+      generateSubtitles(file_id, request, handleJobProgress),
     onMutate: () => {
       setProcessingStatus({
         status: 'processing',
@@ -82,30 +139,12 @@ export const useSubtitleProcessing = () => {
       });
       message.error(error.response?.data?.message || '字幕生成失败');
     },
-    onSettled: () => {
-      // 模拟进度更新
-      let progress = 0;
-      const interval = setInterval(() => {
-        progress += Math.random() * 20;
-        if (progress > 90) progress = 90;
-        
-        setProcessingStatus(prev => 
-          prev.status === 'processing' 
-            ? { ...prev, progress }
-            : prev
-        );
-        
-        if (progress >= 90) {
-          clearInterval(interval);
-        }
-      }, 500);
-    },
   });
 
   // 处理URL
   const processUrlMutation = useMutation({
     mutationFn: ({ url, request }: { url: string; request: SubtitleRequest }) =>
-      processUrlApi(url, request),
+      processUrlApi(url, request, handleJobProgress),
     onMutate: () => {
       setProcessingStatus({
         status: 'processing',
@@ -137,24 +176,6 @@ export const useSubtitleProcessing = () => {
       });
       message.error(error.response?.data?.message || '处理失败');
     },
-    onSettled: () => {
-      // 模拟进度更新
-      let progress = 0;
-      const interval = setInterval(() => {
-        progress += Math.random() * 20;
-        if (progress > 90) progress = 90;
-        
-        setProcessingStatus(prev => 
-          prev.status === 'processing' 
-            ? { ...prev, progress }
-            : prev
-        );
-        
-        if (progress >= 90) {
-          clearInterval(interval);
-        }
-      }, 500);
-    },
   });
 
   // 处理文件上传和字幕生成
@@ -7,7 +7,13 @@ import {
   FileUploadResponse,
   SubtitleEditRequest,
   SubtitleEditResponse,
-  HealthResponse
+  HealthResponse,
+  JobSubmitResponse,
+  JobStatusResponse,
+  JobProgressEvent,
+  TranslatedSegmentEvent,
+  TranslationStreamEvent,
+  UploadSessionResponse
 } from '../types';
 
 const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000/api';
@@ -86,7 +92,61 @@ export const useEnvironmentConfig = async () => {
 };
 
 // 文件上传
-export const uploadFile = async (file: File): Promise<FileUploadResponse> => {
+// 超过该大小的文件使用分块上传，支持断线后续传
+const RESUMABLE_UPLOAD_THRESHOLD = 8 * 1024 * 1024;
+const UPLOAD_MAX_RETRIES = 5;
+
+export type UploadProgressHandler = (uploaded: number, total: number) => void;
+
+const sleep = (ms: number) => new Promise((resolve) => setTimeout(resolve, ms));
+
+export const uploadFileResumable = async (
+  file: File,
+  onProgress?: UploadProgressHandler
+): Promise<FileUploadResponse> => {
+  const created = await api.post<UploadSessionResponse>('/uploads', {
+    filename: file.name,
+    file_size: file.size,
+    content_type: file.type || undefined,
+  });
+  const { session_id, chunk_size } = created.data;
+  let offset = created.data.offset;
+  let retries = 0;
+
+  while (offset < file.size) {
+    const chunk = file.slice(offset, Math.min(offset + chunk_size, file.size));
+    try {
+      const response = await api.put<UploadSessionResponse>(`/uploads/${session_id}`, chunk, {
+        params: { offset },
+        headers: { 'Content-Type': 'application/octet-stream' },
+      });
+      offset = response.data.offset;
+      retries = 0;
+      onProgress?.(offset, file.size);
+    } catch (error: any) {
+      if (error.response?.status === 404 || error.response?.status === 413 || retries >= UPLOAD_MAX_RETRIES) {
+        throw error;
+      }
+      // 断线或偏移不一致时查询服务端已接收的字节数，从断点继续
+      retries += 1;
+      await sleep(Math.min(1000 * 2 ** retries, 30000));
+      const status = await api.get<UploadSessionResponse>(`/uploads/${session_id}`);
+      offset = status.data.offset;
+    }
+  }
+
+  const response = await api.post(`/uploads/${session_id}/complete`);
+  return response.data;
+};
+
+export const uploadFile = async (
+  file: File,
+  onProgress?: UploadProgressHandler
+): Promise<FileUploadResponse> => {
+  if (file.size > RESUMABLE_UPLOAD_THRESHOLD) {
+    return uploadFileResumable(file, onProgress);
+  }
+
   const formData = new FormData();
   formData.append('file', file);
 
@@ -98,27 +158,109 @@ export const uploadFile = async (file: File): Promise<FileUploadResponse> => {
   return response.data;
 };
 
+// 后台任务
+const JOB_POLL_INTERVAL = 2000;
+
+export const getJobStatus = async (job_id: string): Promise<JobStatusResponse> => {
+  const response = await api.get(`/jobs/${job_id}`);
+  return response.data;
+};
+
+export const cancelJob = async (job_id: string) => {
+  const response = await api.delete(`/jobs/${job_id}`);
+  return response.data;
+};
+
+export type JobProgressHandler = (event: JobProgressEvent) => void;
+
+const isJobFinished = (status: string) =>
+  status === 'completed' || status === 'failed' || status === 'cancelled';
+
+// 通过SSE订阅任务进度，任务结束时resolve；连接失败时reject以便回退到轮询
+const watchJobEvents = (job_id: string, onProgress?: JobProgressHandler): Promise<void> =>
+  new Promise((resolve, reject) => {
+    if (typeof EventSource === 'undefined') {
+      reject(new Error('EventSource not supported'));
+      return;
+    }
+
+    const source = new EventSource(`${API_BASE_URL}/jobs/${job_id}/events`);
+    let received = false;
+
+    source.onmessage = (message) => {
+      received = true;
+      const event: JobProgressEvent = JSON.parse(message.data);
+      onProgress?.(event);
+      if (isJobFinished(event.status)) {
+        source.close();
+        resolve();
+      }
+    };
+
+    source.onerror = () => {
+      // 已建立的连接断开时EventSource会自动重连，只有从未收到事件才放弃
+      if (!received) {
+        source.close();
+        reject(new Error('Job event stream unavailable'));
+      }
+    };
+  });
+
+// 等待任务结束，返回处理结果；优先使用SSE，不可用时轮询
+const waitForJob = async (
+  submitted: JobSubmitResponse,
+  onProgress?: JobProgressHandler
+): Promise<SubtitleResponse> => {
+  if (!submitted.success || !submitted.job_id) {
+    return { success: false, message: submitted.message };
+  }
+
+  try {
+    await watchJobEvents(submitted.job_id, onProgress);
+  } catch (error) {
+    console.warn('Falling back to job polling:', error);
+  }
+
+  for (;;) {
+    const job = await getJobStatus(submitted.job_id);
+    if (isJobFinished(job.status)) {
+      return job.result ?? { success: false, message: job.message || 'Job failed' };
+    }
+    onProgress?.({
+      job_id: job.job_id,
+      seq: 0,
+      status: job.status,
+      stage: job.stage,
+      message: job.message,
+      progress: job.progress || {}
+    });
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL));
+  }
+};
+
 // 处理URL音视频
 export const processUrl = async (
   url: string,
-  request: SubtitleRequest
+  request: SubtitleRequest,
+  onProgress?: JobProgressHandler
 ): Promise<SubtitleResponse> => {
-  const response = await api.post('/process-url', {
+  const response = await api.post('/jobs/process-url', {
     url,
     ...request
   });
-  return response.data;
+  return waitForJob(response.data, onProgress);
 };
 
 // 字幕生成
 export const generateSubtitles = async (
   file_id: string,
-  request: SubtitleRequest
+  request: SubtitleRequest,
+  onProgress?: JobProgressHandler
 ): Promise<SubtitleResponse> => {
-  const response = await api.post(`/generate-subtitles`, request, {
+  const response = await api.post(`/jobs/generate-subtitles`, request, {
     params: { file_id },
   });
-  return response.data;
+  return waitForJob(response.data, onProgress);
 };
 
 // 字幕编辑
@@ -141,6 +283,60 @@ export const translateSubtitles = async (
   return response.data;
 };
 
+// 流式字幕翻译：每个批次完成后回调已翻译的片段，最终返回完整结果
+export const translateSubtitlesStream = async (
+  originalSrt: string,
+  targetLanguage: string,
+  onSegments: (segments: TranslatedSegmentEvent[], total: number) => void
+): Promise<SubtitleEditResponse> => {
+  const response = await fetch(`${API_BASE_URL}/translate-subtitles/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      original_srt: originalSrt,
+      target_language: targetLanguage
+    })
+  });
+
+  if (!response.ok || !response.body) {
+    const error = await response.json().catch(() => ({}));
+    return { success: false, message: error.detail || `Translation failed (${response.status})` };
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let total = 0;
+  let result: SubtitleEditResponse = { success: false, message: 'Translation stream ended unexpectedly' };
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split('\n');
+    buffer = lines.pop() || '';
+
+    const segments: TranslatedSegmentEvent[] = [];
+    for (const line of lines) {
+      if (!line.trim()) continue;
+      const event: TranslationStreamEvent = JSON.parse(line);
+      if (event.type === 'start') {
+        total = event.segment_count;
+      } else if (event.type === 'segment') {
+        segments.push(event);
+      } else {
+        result = event;
+      }
+    }
+    if (segments.length) {
+      onSegments(segments, total);
+    }
+  }
+
+  return result;
+};
+
 // 文件信息
 export const getFileInfo = async (file_id: string) => {
   const response = await api.get(`/file/${file_id}`);
@@ -20,6 +20,8 @@ export interface SubtitleResponse {
   translated_srt?: string;
   duration?: number;
   segment_count?: number;
+  translation_memory_hits?: number;
+  translation_memory_misses?: number;
 }
 
 export interface APIConfig {
@@ -51,6 +53,18 @@ export interface FileUploadResponse {
   file_size?: number;
   file_type?: string;
   is_video?: boolean;
+  file_hash?: string;
+  deduplicated?: boolean;
+}
+
+export interface UploadSessionResponse {
+  session_id: string;
+  filename: string;
+  file_size: number;
+  offset: number;
+  chunk_size: number;
+  max_chunk_size: number;
+  expires_at: string;
 }
 
 export interface SubtitleEditRequest {
@@ -65,6 +79,54 @@ export interface SubtitleEditResponse {
   translated_srt?: string;
 }
 
+export type JobStatus = 'pending' | 'running' | 'completed' | 'failed' | 'cancelled';
+
+export interface JobSubmitResponse {
+  success: boolean;
+  message: string;
+  job_id?: string;
+  status?: JobStatus;
+}
+
+export interface JobStatusResponse {
+  job_id: string;
+  kind: string;
+  status: JobStatus;
+  stage?: string;
+  message?: string;
+  progress?: Record<string, any>;
+  created_at: string;
+  started_at?: string;
+  finished_at?: string;
+  result?: SubtitleResponse;
+}
+
+export interface JobProgressEvent {
+  job_id: string;
+  seq: number;
+  status: JobStatus;
+  stage?: string;
+  message?: string;
+  progress: Record<string, any>;
+}
+
+export interface TranslatedSegmentEvent {
+  type: 'segment';
+  index: number;
+  start: number;
+  end: number;
+  start_time: string;
+  end_time: string;
+  text: string;
+  translated_text?: string | null;
+}
+
+export type TranslationStreamEvent =
+  | { type: 'start'; segment_count: number }
+  | TranslatedSegmentEvent
+  | ({ type: 'done' } & SubtitleEditResponse & { failed_count: number })
+  | { type: 'error'; success: false; message: string };
+
 export interface HealthResponse {
   status: string;
   timestamp: string;